@@ -0,0 +1,46 @@
+# app/core/http.py
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# Transient gateway errors worth retrying transparently
+RETRY_STATUS_CODES = (502, 503, 504)
+
+def create_http_session(
+    pool_connections: int = 4,
+    pool_maxsize: int = 32,
+    max_retries: int = 3,
+    backoff_factor: float = 0.5
+) -> requests.Session:
+    """
+    Create a requests.Session with a keep-alive connection pool, meant to be
+    shared by every service in the process so TCP/TLS connections are reused.
+
+    :param pool_connections: Number of hosts to keep connection pools for
+    :param pool_maxsize: Maximum connections kept per host; should cover the
+                         number of threads issuing requests concurrently
+    :param max_retries: Retries for connection errors and 502/503/504 responses
+                        on idempotent requests; read timeouts are not retried
+    :param backoff_factor: Exponential backoff factor between retries
+    :return: Configured session
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=pool_connections,
+        pool_maxsize=pool_maxsize,
+        max_retries=Retry(
+            total=max_retries,
+            # Read timeouts are raised as-is: the caller already waited its full
+            # timeout, and retrying would multiply the worst-case latency
+            read=False,
+            backoff_factor=backoff_factor,
+            status_forcelist=RETRY_STATUS_CODES,
+            # Hand the final error response back so callers' own status
+            # handling still applies
+            raise_on_status=False
+        )
+    )
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
@@ -0,0 +1,25 @@
+# app/core/risk.py
+
+from typing import Optional
+
+# Upper score bound (exclusive) of each risk level; anything above is CRITICAL
+RISK_LEVEL_THRESHOLDS = (
+    (500, "LOW"),
+    (750, "MEDIUM"),
+    (1000, "HIGH"),
+)
+CRITICAL_RISK_LEVEL = "CRITICAL"
+
+def classify_risk(score: Optional[float]) -> Optional[str]:
+    """
+    Map a RugCheck risk score to a human-readable risk level.
+
+    :param score: Risk score, lower is safer
+    :return: LOW, MEDIUM, HIGH or CRITICAL, or None without a score
+    """
+    if score is None:
+        return None
+    for upper_bound, level in RISK_LEVEL_THRESHOLDS:
+        if score < upper_bound:
+            return level
+    return CRITICAL_RISK_LEVEL
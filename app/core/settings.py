@@ -33,6 +33,9 @@ IS_PRODUCTION = ENV == "production"
 if IS_PRODUCTION:
     DEFAULT_LOG_LEVEL = logging.WARNING
 
+# Log output format: "text" for humans, "json" for log pipelines
+LOG_FORMAT = os.getenv("LOG_FORMAT", "json" if IS_PRODUCTION else "text").lower()
+
 # -------------------------------------------------------------------------
 # Other Global Constants
 # -------------------------------------------------------------------------
@@ -2,11 +2,14 @@
 import os
 import logging
 from pathlib import Path
-from sqlalchemy import create_engine, inspect
+from sqlalchemy import create_engine, inspect, text, case, update, select, Index
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import QueuePool
 from sqlalchemy.exc import SQLAlchemyError
 
+from app.core.risk import RISK_LEVEL_THRESHOLDS, CRITICAL_RISK_LEVEL
+
 logger = logging.getLogger(__name__)
 
 # Declarative Base
@@ -23,19 +26,32 @@ def get_database_url() -> str:
 DATABASE_URL = get_database_url()
 logger.info(f"Initializing database with URL: {DATABASE_URL}")
 
+# The engine and its pool are module-level and live for the whole process;
+# the scheduler must not create engines per cycle, so warm connections are
+# reused instead of reconnecting (TCP + auth handshake) every run
+IS_SQLITE = DATABASE_URL.startswith("sqlite")
+
 engine = create_engine(
     DATABASE_URL,
     connect_args={
         "check_same_thread": False,  # Needed for SQLite
         "timeout": 30  # Wait up to 30 seconds for locks
-    } if DATABASE_URL.startswith("sqlite") else {},
+    } if IS_SQLITE else {},
+    # A small persistent pool covers the writer thread, the prefetch query
+    # and bot commands; SQLite keeps SQLAlchemy's default pool
+    **({} if IS_SQLITE else {"pool_size": 5, "max_overflow": 10}),
     pool_pre_ping=True,  # Enable automatic reconnection
-    pool_recycle=3600,   # Recycle connections every hour
+    pool_recycle=1800,   # Recycle connections every 30 minutes
     echo=False          # Set to True for SQL logging
 )
 
-# Session maker
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# Session maker. Objects stay usable after commit without a refresh SELECT
+SessionLocal = sessionmaker(
+    autocommit=False,
+    autoflush=False,
+    expire_on_commit=False,
+    bind=engine
+)
 
 def check_db_exists() -> bool:
     """Check if the database exists and has the required tables."""
@@ -55,6 +71,12 @@ def init_db(force: bool = False) -> None:
     :raises: SQLAlchemyError if database initialization fails
     """
     try:
+        # Cycles rely on pooled connections being reused between runs
+        if not IS_SQLITE and not isinstance(engine.pool, QueuePool):
+            raise SQLAlchemyError(
+                f"Expected a QueuePool-backed engine, got {type(engine.pool).__name__}"
+            )
+        
         if force:
             logger.warning("Forcing database reinitialization...")
             Base.metadata.drop_all(bind=engine)
@@ -64,12 +86,113 @@ def init_db(force: bool = False) -> None:
             Base.metadata.create_all(bind=engine)
             logger.info("Database initialization complete.")
         else:
+            # The history is seeded before duplicates are collapsed, so the
+            # unique index migration loses no price points
+            ensure_price_history_table()
+            ensure_token_unique_index()
+            ensure_risk_level_column()
+            ensure_indexes()
             logger.info("Database already initialized.")
             
     except SQLAlchemyError as e:
         logger.error(f"Database initialization failed: {e}")
         raise
 
+def ensure_price_history_table() -> None:
+    """
+    Create the token_price_history table on databases created before it
+    existed, seeded with the price point of every stored snapshot.
+    """
+    inspector = inspect(engine)
+    if 'token_price_history' in inspector.get_table_names():
+        return
+    
+    logger.info("Creating token_price_history table...")
+    history = Base.metadata.tables['token_price_history']
+    snapshots = Base.metadata.tables['token_snapshots']
+    columns = ['timestamp', 'chain_id', 'token_address', 'price_usd', 'liquidity_usd', 'volume_usd']
+    with engine.begin() as conn:
+        history.create(bind=conn)
+        result = conn.execute(
+            history.insert().from_select(
+                columns,
+                select(*[snapshots.c[column] for column in columns]).order_by(snapshots.c.id)
+            )
+        )
+        logger.info(f"Seeded token_price_history with {result.rowcount} price points")
+
+def ensure_token_unique_index() -> None:
+    """
+    Add the unique (chain_id, token_address) index to databases created
+    before it existed. Duplicate rows are collapsed first, keeping the oldest
+    row per token, which is the one the fetch task has been updating. Their
+    price points stay in token_price_history, see ensure_price_history_table.
+    """
+    inspector = inspect(engine)
+    if any(ix['name'] == 'ix_token_chain_addr' for ix in inspector.get_indexes('token_snapshots')):
+        return
+    
+    logger.info("Adding unique index on token_snapshots (chain_id, token_address)...")
+    with engine.begin() as conn:
+        result = conn.execute(text(
+            "DELETE FROM token_snapshots WHERE id NOT IN ("
+            "SELECT MIN(id) FROM token_snapshots GROUP BY chain_id, token_address)"
+        ))
+        if result.rowcount:
+            logger.warning(
+                f"Collapsed {result.rowcount} duplicate token snapshots into one row per "
+                f"token; their price points are kept in token_price_history"
+            )
+        conn.execute(text(
+            "CREATE UNIQUE INDEX ix_token_chain_addr "
+            "ON token_snapshots (chain_id, token_address)"
+        ))
+
+def ensure_risk_level_column() -> None:
+    """
+    Add the risk_level column to databases created before it existed and
+    backfill it from the score stored in risk_data.
+    """
+    inspector = inspect(engine)
+    if any(col['name'] == 'risk_level' for col in inspector.get_columns('token_snapshots')):
+        return
+    
+    logger.info("Adding risk_level column to token_snapshots...")
+    snapshots = Base.metadata.tables['token_snapshots']
+    score = snapshots.c.risk_data['score'].as_float()
+    risk_level = case(
+        *[(score < upper_bound, level) for upper_bound, level in RISK_LEVEL_THRESHOLDS],
+        else_=CRITICAL_RISK_LEVEL
+    )
+    with engine.begin() as conn:
+        conn.execute(text("ALTER TABLE token_snapshots ADD COLUMN risk_level VARCHAR(20)"))
+        result = conn.execute(
+            update(snapshots)
+            .where(score.is_not(None))
+            .values(risk_level=risk_level)
+        )
+        logger.info(f"Backfilled risk_level for {result.rowcount} token snapshots")
+
+# Indexes dropped from the models that existing databases may still have
+STALE_INDEXES = {
+    # Pump analysis reads token_price_history, see ix_price_history_ts_token
+    'token_snapshots': ('ix_token_ts_addr',),
+}
+
+def ensure_indexes() -> None:
+    """Create any model index missing from an existing database and drop stale ones."""
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=engine, checkfirst=True)
+    
+    inspector = inspect(engine)
+    for table_name, index_names in STALE_INDEXES.items():
+        present = {ix['name'] for ix in inspector.get_indexes(table_name)}
+        for index_name in index_names:
+            if index_name in present:
+                logger.info(f"Dropping stale index {index_name} on {table_name}...")
+                Index(index_name, Base.metadata.tables[table_name].c.id).drop(bind=engine)
+
 def get_db():
     """
     Get a database session.
@@ -2,10 +2,11 @@
 
 from datetime import datetime
 from typing import Dict, Any, List, Optional
-from sqlalchemy import Column, Integer, String, Float, DateTime, JSON, Text
+from sqlalchemy import Column, Integer, String, Float, DateTime, JSON, Text, Index
 from sqlalchemy.ext.mutable import MutableDict
 from sqlalchemy.sql import func
 
+from app.core.risk import classify_risk
 from app.database.base import Base
 
 class TokenSnapshot(Base):
@@ -14,6 +15,10 @@ class TokenSnapshot(Base):
     Stores both the token profile and any additional metrics/risk data.
     """
     __tablename__ = "token_snapshots"
+    __table_args__ = (
+        # One row per token; snapshots are upserted on this key
+        Index('ix_token_chain_addr', 'chain_id', 'token_address', unique=True),
+    )
 
     id = Column(Integer, primary_key=True)
     timestamp = Column(DateTime, server_default=func.now(), nullable=False)
@@ -39,6 +44,8 @@ class TokenSnapshot(Base):
     
     # Risk Assessment Data
     risk_data = Column(MutableDict.as_mutable(JSON))
+    # Level derived from risk_data['score'], stored so readers don't recompute it
+    risk_level = Column(String(20))
 
     def to_dict(self) -> Dict[str, Any]:
         """Convert the snapshot to a dictionary."""
@@ -58,27 +65,28 @@ class TokenSnapshot(Base):
             'price_usd': self.price_usd,
             'liquidity_usd': self.liquidity_usd,
             'volume_usd': self.volume_usd,
-            'risk_data': self.risk_data
+            'risk_data': self.risk_data,
+            'risk_level': self.risk_level
         }
 
-    @classmethod
-    def from_token_profile(
-        cls,
+    @staticmethod
+    def values_from_token_profile(
         profile: 'TokenProfile',
         price_usd: Optional[float] = None,
         liquidity_usd: Optional[float] = None,
         volume_usd: Optional[float] = None,
         risk_data: Optional[Dict[str, Any]] = None
-    ) -> 'TokenSnapshot':
+    ) -> Dict[str, Any]:
         """
-        Create a TokenSnapshot from a DexScreener TokenProfile.
+        Build the column values for a snapshot of a DexScreener TokenProfile.
+        Suitable for bulk inserts, e.g. session.execute(insert(TokenSnapshot), rows).
         
         :param profile: TokenProfile instance
         :param price_usd: Current price in USD
         :param liquidity_usd: Current liquidity in USD
         :param volume_usd: Current volume in USD
         :param risk_data: Optional risk assessment data
-        :return: TokenSnapshot instance
+        :return: Dictionary of column values
         """
         # Convert links list to a dictionary with indices as keys
         links_dict = {}
@@ -90,19 +98,80 @@ class TokenSnapshot(Base):
                     **({"label": link.label} if link.label else {})
                 }
         
-        return cls(
-            token_address=profile.token_address,
-            chain_id=profile.chain_id,
-            token_name=profile.name,
-            token_symbol=profile.symbol,
-            dexscreener_url=profile.url,
-            icon_url=profile.icon,
-            header_url=profile.header,
-            open_graph_url=profile.open_graph,
-            description=profile.description,
-            links=links_dict,
+        return {
+            'token_address': profile.token_address,
+            'chain_id': profile.chain_id,
+            'token_name': profile.name,
+            'token_symbol': profile.symbol,
+            'dexscreener_url': profile.url,
+            'icon_url': profile.icon,
+            'header_url': profile.header,
+            'open_graph_url': profile.open_graph,
+            'description': profile.description,
+            'links': links_dict,
+            'price_usd': price_usd,
+            'liquidity_usd': liquidity_usd,
+            'volume_usd': volume_usd,
+            'risk_data': risk_data,
+            'risk_level': classify_risk(risk_data.get('score')) if risk_data else None
+        }
+
+    @classmethod
+    def from_token_profile(
+        cls,
+        profile: 'TokenProfile',
+        price_usd: Optional[float] = None,
+        liquidity_usd: Optional[float] = None,
+        volume_usd: Optional[float] = None,
+        risk_data: Optional[Dict[str, Any]] = None
+    ) -> 'TokenSnapshot':
+        """
+        Create a TokenSnapshot from a DexScreener TokenProfile.
+        
+        :param profile: TokenProfile instance
+        :param price_usd: Current price in USD
+        :param liquidity_usd: Current liquidity in USD
+        :param volume_usd: Current volume in USD
+        :param risk_data: Optional risk assessment data
+        :return: TokenSnapshot instance
+        """
+        return cls(**cls.values_from_token_profile(
+            profile,
             price_usd=price_usd,
             liquidity_usd=liquidity_usd,
             volume_usd=volume_usd,
             risk_data=risk_data
-        )
+        ))
+
+class TokenPriceHistory(Base):
+    """
+    A price point recorded every time a token snapshot is written.
+    token_snapshots keeps one row per token; this table keeps the series
+    that pump analysis compares over time.
+    """
+    __tablename__ = "token_price_history"
+    __table_args__ = (
+        # Pump analysis scans a recent time window, partitioned by token
+        Index('ix_price_history_ts_token', 'timestamp', 'chain_id', 'token_address'),
+    )
+
+    id = Column(Integer, primary_key=True)
+    timestamp = Column(DateTime, server_default=func.now(), nullable=False)
+    chain_id = Column(String(50), nullable=False)
+    token_address = Column(String(255), nullable=False)
+    price_usd = Column(Float)
+    liquidity_usd = Column(Float)
+    volume_usd = Column(Float)
+
+    # Snapshot columns copied into each price point
+    SNAPSHOT_COLUMNS = ('chain_id', 'token_address', 'price_usd', 'liquidity_usd', 'volume_usd')
+
+    @classmethod
+    def values_from_snapshot(cls, snapshot_values: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Build the column values for the price point of a snapshot write.
+
+        :param snapshot_values: Column values of the snapshot, see TokenSnapshot.values_from_token_profile
+        :return: Dictionary of column values
+        """
+        return {column: snapshot_values.get(column) for column in cls.SNAPSHOT_COLUMNS}
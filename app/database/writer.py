@@ -0,0 +1,292 @@
+# app/database/writer.py
+
+import logging
+import queue
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+from sqlalchemy import func, insert, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.sql.dml import Insert
+
+from app.database.base import SessionLocal
+from app.database.models import TokenPriceHistory, TokenSnapshot
+
+logger = logging.getLogger(__name__)
+
+# Columns refreshed when a snapshot for an already stored token is written
+UPSERT_UPDATE_COLUMNS = ('price_usd', 'volume_usd', 'liquidity_usd', 'risk_data', 'risk_level')
+
+# Dialects with INSERT ... ON CONFLICT; others use update-by-id plus insert
+UPSERT_DIALECTS = ('postgresql', 'sqlite')
+
+def build_snapshot_upsert(dialect_name: str) -> Insert:
+    """
+    Build an INSERT ... ON CONFLICT (chain_id, token_address) DO UPDATE
+    statement for token snapshots.
+
+    :param dialect_name: SQLAlchemy dialect name of the target database
+    :return: Statement to execute with a list of row values
+    :raises: ValueError if the dialect has no ON CONFLICT support
+    """
+    if dialect_name == 'postgresql':
+        stmt = postgresql.insert(TokenSnapshot)
+    elif dialect_name == 'sqlite':
+        stmt = sqlite.insert(TokenSnapshot)
+    else:
+        raise ValueError(f"Snapshot upserts are not supported on {dialect_name}")
+
+    set_ = {column: stmt.excluded[column] for column in UPSERT_UPDATE_COLUMNS}
+    set_['timestamp'] = func.now()
+    return stmt.on_conflict_do_update(
+        index_elements=['chain_id', 'token_address'],
+        set_=set_
+    )
+
+@dataclass
+class SnapshotWrite:
+    """
+    A pending write for the background writer.
+
+    The values are upserted on (chain_id, token_address): a new token gets a
+    new row, a known one has its market and risk columns refreshed.
+    """
+    values: Dict[str, Any]
+    on_commit: Optional[Callable[[], None]] = None
+
+class SnapshotWriter:
+    """
+    Persists token snapshots on a background thread so the caller can keep
+    fetching while SQL is executed.
+
+    Queued writes are grouped into pages of up to `batch_size` rows, or
+    whatever arrived within `flush_interval_sec`, and sent as one bulk
+    upsert statement per page, plus one bulk insert of the page's price
+    points into token_price_history. Everything is committed once, in a single
+    transaction, when the writer is closed; post-commit callbacks (e.g.
+    notifications) only run if that commit succeeds.
+    """
+
+    def __init__(
+        self,
+        session_factory: sessionmaker = SessionLocal,
+        batch_size: int = 500,
+        flush_interval_sec: float = 0.5
+    ):
+        """
+        Initialize the writer.
+
+        :param session_factory: Factory used to open the writer's session
+        :param batch_size: Maximum number of rows per bulk statement
+        :param flush_interval_sec: Maximum time to wait while filling a page
+        """
+        self.session_factory = session_factory
+        self.batch_size = batch_size
+        self.flush_interval_sec = flush_interval_sec
+        self._queue: "queue.Queue[Optional[SnapshotWrite]]" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._pending: List[SnapshotWrite] = []
+        self._upsert: Optional[Insert] = None
+        self._error: Optional[Exception] = None
+
+        # Track writer statistics
+        self.written = 0
+        self.failed = 0
+
+    def start(self) -> None:
+        """
+        Start the background writer thread.
+
+        Databases without ON CONFLICT support are written with a portable
+        update-by-id plus insert fallback instead of a bulk upsert.
+        """
+        if self._thread and self._thread.is_alive():
+            return
+        with self.session_factory() as session:
+            dialect_name = session.get_bind().dialect.name
+        if dialect_name in UPSERT_DIALECTS:
+            self._upsert = build_snapshot_upsert(dialect_name)
+        else:
+            self._upsert = None
+            logger.debug(f"No snapshot upsert on {dialect_name}, updating by id instead")
+        self._thread = threading.Thread(
+            target=self._run,
+            name="snapshot-writer",
+            daemon=True
+        )
+        self._thread.start()
+
+    def put(self, write: SnapshotWrite) -> None:
+        """Queue a write; it is persisted by the background thread."""
+        self._queue.put(write)
+
+    def close(self) -> None:
+        """
+        Flush all queued writes, commit them and stop the background thread.
+
+        Database errors are logged and counted in `failed`. Any other error
+        that stopped the writer is re-raised here, after every queued write
+        has been counted as failed.
+        """
+        if not self._thread:
+            return
+        self._queue.put(None)
+        self._thread.join()
+        self._thread = None
+        if self._error and not isinstance(self._error, SQLAlchemyError):
+            raise self._error
+
+    def __enter__(self) -> 'SnapshotWriter':
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        try:
+            self.close()
+        except Exception:
+            if exc_type is None:
+                raise
+            # Don't mask the exception already propagating from the block
+            logger.error("Snapshot writer failed", exc_info=True)
+
+    def _run(self) -> None:
+        """Consume the queue until the stop sentinel arrives, then commit."""
+        batch: List[SnapshotWrite] = []
+        stopping = False
+        try:
+            with self.session_factory() as session:
+                while not stopping:
+                    batch = []
+                    item = self._queue.get()
+                    if item is None:
+                        stopping = True
+                        break
+                    batch.append(item)
+
+                    # Fill the page until it is full or the flush interval elapses
+                    deadline = time.monotonic() + self.flush_interval_sec
+                    while len(batch) < self.batch_size:
+                        remaining = deadline - time.monotonic()
+                        if remaining <= 0:
+                            break
+                        try:
+                            item = self._queue.get(timeout=remaining)
+                        except queue.Empty:
+                            break
+                        if item is None:
+                            stopping = True
+                            break
+                        batch.append(item)
+
+                    self._execute_batch(session, self._upsert, batch)
+                    # The batch is now either pending or counted as failed
+                    batch = []
+
+                self._commit(session)
+        except Exception as e:
+            # Unexpected error: the transaction is lost, so account for every
+            # write, including those still queued, as failed
+            self._error = e
+            self.failed += len(self._pending) + len(batch)
+            self._pending.clear()
+            logger.error(f"Snapshot writer stopped unexpectedly: {e}", exc_info=True)
+            if not stopping:
+                self._drain_failed()
+
+    def _drain_failed(self) -> None:
+        """Count every write queued before the stop sentinel as failed."""
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            self.failed += 1
+
+    def _execute_batch(self, session, upsert: Optional[Insert], batch: List[SnapshotWrite]) -> None:
+        """
+        Send one page of writes as a bulk upsert, and append each write's
+        price point to the price history in the same transaction.
+        """
+        if self._error:
+            # The transaction is already lost; nothing after the failure is kept
+            self.failed += len(batch)
+            return
+
+        try:
+            if upsert is not None:
+                session.execute(upsert, [w.values for w in batch])
+            else:
+                self._update_or_insert(session, batch)
+            session.execute(
+                insert(TokenPriceHistory),
+                [TokenPriceHistory.values_from_snapshot(w.values) for w in batch]
+            )
+        except SQLAlchemyError as e:
+            self._error = e
+            self.failed += len(self._pending) + len(batch)
+            self._pending.clear()
+            session.rollback()
+            logger.error(f"Failed to write token snapshots, rolling back: {e}")
+            return
+
+        self._pending.extend(batch)
+        logger.debug(f"Upserted {len(batch)} token snapshots")
+
+    def _update_or_insert(self, session, batch: List[SnapshotWrite]) -> None:
+        """
+        Write a page without ON CONFLICT: tokens that already have a row are
+        updated by primary key, the others are inserted.
+        """
+        addresses = {w.values['token_address'] for w in batch}
+        existing_ids = {
+            (chain_id, token_address): snapshot_id
+            for snapshot_id, chain_id, token_address in session.execute(
+                select(TokenSnapshot.id, TokenSnapshot.chain_id, TokenSnapshot.token_address)
+                .where(TokenSnapshot.token_address.in_(addresses))
+            )
+        }
+
+        now = datetime.utcnow()
+        updates: List[Dict[str, Any]] = []
+        inserts: List[Dict[str, Any]] = []
+        for write in batch:
+            values = write.values
+            snapshot_id = existing_ids.get((values['chain_id'], values['token_address']))
+            if snapshot_id is None:
+                inserts.append(values)
+            else:
+                row = {column: values.get(column) for column in UPSERT_UPDATE_COLUMNS}
+                row.update(id=snapshot_id, timestamp=now)
+                updates.append(row)
+
+        if updates:
+            session.execute(update(TokenSnapshot), updates)
+        if inserts:
+            session.execute(insert(TokenSnapshot), inserts)
+
+    def _commit(self, session) -> None:
+        """Commit all executed writes and run their post-commit callbacks."""
+        if not self._pending:
+            return
+
+        try:
+            session.commit()
+        except SQLAlchemyError as e:
+            session.rollback()
+            self.failed += len(self._pending)
+            self._pending.clear()
+            logger.error(f"Failed to commit token snapshots: {e}")
+            return
+
+        self.written += len(self._pending)
+        for write in self._pending:
+            if write.on_commit:
+                try:
+                    write.on_commit()
+                except Exception as e:
+                    logger.error(f"Post-commit callback failed: {e}")
+        self._pending.clear()
@@ -2,16 +2,24 @@ import logging
 import sys
 import argparse
 from app.config.loader import load_config, ConfigError
+from app.core.log_format import JsonFormatter
+from app.core.settings import DEFAULT_LOG_LEVEL, LOG_FORMAT
 from app.database.base import init_db
 from app.tasks.scheduler import run_scheduler
 
 def setup_logging(debug: bool = False) -> logging.Logger:
     """Configure logging for the application."""
-    log_level = logging.DEBUG if debug else logging.INFO
-    logging.basicConfig(
-        level=log_level,
-        format="%(asctime)s [%(levelname)s] %(name)s - %(message)s"
-    )
+    # DEFAULT_LOG_LEVEL is WARNING in production, so per-token INFO logs are never formatted
+    log_level = logging.DEBUG if debug else DEFAULT_LOG_LEVEL
+    if LOG_FORMAT == "json":
+        handler = logging.StreamHandler()
+        handler.setFormatter(JsonFormatter())
+        logging.basicConfig(level=log_level, handlers=[handler])
+    else:
+        logging.basicConfig(
+            level=log_level,
+            format="%(asctime)s [%(levelname)s] %(name)s - %(message)s"
+        )
     return logging.getLogger(__name__)
 
 def main():
@@ -3,9 +3,10 @@
 import logging
 from datetime import datetime, timedelta
 from typing import List, Dict, Any
+from sqlalchemy import and_, func, select
 from sqlalchemy.orm import Session
 
-from app.database.models import TokenSnapshot
+from app.database.models import TokenPriceHistory, TokenSnapshot
 
 logger = logging.getLogger(__name__)
 
@@ -16,7 +17,8 @@ def analyze_pumped_tokens(
     min_volume_usd: float = 1000.0
 ) -> List[Dict[str, Any]]:
     """
-    Analyze token snapshots to detect significant price increases.
+    Analyze the token price history to detect significant price increases.
+    Filtering and ranking run in SQL, so only flagged tokens are loaded.
     
     :param session: Database session
     :param lookback_minutes: How far back to look for price changes
@@ -26,77 +28,75 @@ def analyze_pumped_tokens(
     """
     cutoff_time = datetime.utcnow() - timedelta(minutes=lookback_minutes)
     
-    # Get snapshots ordered by timestamp
-    snapshots = (
-        session.query(TokenSnapshot)
-        .filter(TokenSnapshot.timestamp >= cutoff_time)
-        .order_by(TokenSnapshot.timestamp.asc())
-        .all()
+    # Rank each token's price points in the window and carry its first price,
+    # so the database can compare first and last point directly
+    by_token = {"partition_by": (TokenPriceHistory.chain_id, TokenPriceHistory.token_address)}
+    window = (
+        select(
+            TokenPriceHistory.chain_id,
+            TokenPriceHistory.token_address,
+            TokenPriceHistory.price_usd,
+            func.first_value(TokenPriceHistory.price_usd).over(
+                **by_token, order_by=(TokenPriceHistory.timestamp.asc(), TokenPriceHistory.id.asc())
+            ).label("initial_price"),
+            func.row_number().over(
+                **by_token, order_by=(TokenPriceHistory.timestamp.desc(), TokenPriceHistory.id.desc())
+            ).label("recency"),
+            func.count().over(**by_token).label("snapshot_count")
+        )
+        .where(TokenPriceHistory.timestamp >= cutoff_time)
+        .subquery()
     )
+    current_price = window.c.price_usd
+    price_change = (current_price - window.c.initial_price) / window.c.initial_price * 100
     
-    # Group snapshots by token
-    token_snapshots: Dict[str, List[TokenSnapshot]] = {}
-    for snapshot in snapshots:
-        if snapshot.token_address not in token_snapshots:
-            token_snapshots[snapshot.token_address] = []
-        token_snapshots[snapshot.token_address].append(snapshot)
+    # Only the latest point of each pumped token crosses into Python, joined
+    # with the token's snapshot for its metadata, volume and risk data
+    rows = session.execute(
+        select(
+            TokenSnapshot,
+            window.c.initial_price,
+            current_price.label("current_price"),
+            price_change.label("price_change_percent")
+        )
+        .join(
+            window,
+            and_(
+                window.c.chain_id == TokenSnapshot.chain_id,
+                window.c.token_address == TokenSnapshot.token_address
+            )
+        )
+        .where(
+            window.c.recency == 1,
+            window.c.snapshot_count >= 2,
+            window.c.initial_price > 0,
+            current_price > 0,
+            TokenSnapshot.volume_usd > 0,
+            TokenSnapshot.volume_usd >= min_volume_usd,
+            price_change >= min_price_increase_percent
+        )
+        .order_by(price_change.desc())
+    ).all()
     
-    # Analyze each token's price movement
     pumped_tokens = []
-    for token_address, token_history in token_snapshots.items():
-        if len(token_history) < 2:
-            continue
-            
-        # Get first and last snapshots
-        first = token_history[0]
-        last = token_history[-1]
-        
-        # Skip if missing required data
-        if not (first.price_usd and last.price_usd and last.volume_usd):
-            continue
-            
-        # Calculate price change
-        price_change_percent = ((last.price_usd - first.price_usd) / first.price_usd) * 100
-        
-        # Check if meets pump criteria
-        if (price_change_percent >= min_price_increase_percent and 
-            last.volume_usd >= min_volume_usd):
-            
-            # Get risk level if available
-            risk_level = "Unknown"
-            risk_score = None
-            if last.risk_data:
-                risk_score = last.risk_data.get('score')
-                if risk_score is not None:
-                    if risk_score < 500:
-                        risk_level = "LOW"
-                    elif risk_score < 750:
-                        risk_level = "MEDIUM"
-                    elif risk_score < 1000:
-                        risk_level = "HIGH"
-                    else:
-                        risk_level = "CRITICAL"
-            
-            pumped_tokens.append({
-                'token_address': token_address,
-                'chain_id': last.chain_id,
-                'token_name': last.token_name,
-                'token_symbol': last.token_symbol,
-                'dexscreener_url': last.dexscreener_url,
-                'description': last.description,
-                'links': last.links,
-                'initial_price': first.price_usd,
-                'current_price': last.price_usd,
-                'price_change_percent': price_change_percent,
-                'volume_usd': last.volume_usd,
-                'liquidity_usd': last.liquidity_usd,
-                'risk_level': risk_level,
-                'risk_score': risk_score,
-                'risk_data': last.risk_data
-            })
+    for last, initial_price, current_price, price_change_percent in rows:
+        risk_score = last.risk_data.get('score') if last.risk_data else None
+        pumped_tokens.append({
+            'token_address': last.token_address,
+            'chain_id': last.chain_id,
+            'token_name': last.token_name,
+            'token_symbol': last.token_symbol,
+            'dexscreener_url': last.dexscreener_url,
+            'description': last.description,
+            'links': last.links,
+            'initial_price': initial_price,
+            'current_price': current_price,
+            'price_change_percent': price_change_percent,
+            'volume_usd': last.volume_usd,
+            'liquidity_usd': last.liquidity_usd,
+            'risk_level': last.risk_level or "Unknown",
+            'risk_score': risk_score,
+            'risk_data': last.risk_data
+        })
     
-    return sorted(
-        pumped_tokens,
-        key=lambda x: x['price_change_percent'],
-        reverse=True
-    )
+    return pumped_tokens
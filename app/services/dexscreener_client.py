@@ -1,8 +1,12 @@
 import logging
+import sys
+import threading
 import time
 import json
+from concurrent.futures import ThreadPoolExecutor
 from typing import Any, Dict, Optional, Union, List
 from datetime import datetime, timedelta
+import orjson
 import requests
 from requests.adapters import HTTPAdapter
 from urllib3.util.retry import Retry
@@ -45,7 +49,8 @@ class TokenProfile:
         
         return cls(
             url=data['url'],
-            chain_id=data['chainId'],
+            # A handful of chain ids repeat across every profile; share one object
+            chain_id=sys.intern(data['chainId']),
             token_address=data['tokenAddress'],
             name=data.get('name'),
             symbol=data.get('symbol'),
@@ -138,7 +143,8 @@ class BoostedToken:
         
         return cls(
             url=data['url'],
-            chain_id=data['chainId'],
+            # A handful of chain ids repeat across every profile; share one object
+            chain_id=sys.intern(data['chainId']),
             token_address=data['tokenAddress'],
             amount=data.get('amount', 0),
             total_amount=data.get('totalAmount', 0),
@@ -183,10 +189,20 @@ class DexscreenerClient:
         "pairs": RateLimit(300, "pair data"),
         "boosts": RateLimit(60, "token boosts")
     }
+    
+    # Maximum number of token addresses accepted by the multi-token endpoint
+    MAX_TOKENS_PER_REQUEST = 30
+    # Concurrent requests used by batch lookups; keep well under the rate limit
+    MAX_CONCURRENT_REQUESTS = 4
 
-    def __init__(self):
-        """Initialize the DexScreener client."""
-        self.session = requests.Session()
+    def __init__(self, session: Optional[requests.Session] = None):
+        """
+        Initialize the DexScreener client.
+        
+        :param session: Optional shared HTTP session to reuse connections
+        """
+        self.session = session or requests.Session()
+        self._owns_session = session is None
 
         # Track request timestamps for rate limiting
         self._last_request_time: Dict[str, float] = {
@@ -194,8 +210,10 @@ class DexscreenerClient:
             "pairs": 0.0,
             "boosts": 0.0
         }
+        self._rate_limit_lock = threading.Lock()
         
-        # Track service health
+        # Track service health; updated from concurrent requests, so always
+        # under _rate_limit_lock
         self._consecutive_failures = 0
         self._total_requests = 0
         self._failed_requests = 0
@@ -212,24 +230,25 @@ class DexscreenerClient:
         :param endpoint: API endpoint path
         :param rate_limit_key: Key for rate limit configuration
         :param params: Optional query parameters
-        :return: JSON response data
+        :return: Decoded JSON response data
         :raises: DexscreenerError on API errors
         """
-        # Apply rate limiting
+        # Apply rate limiting. Each caller reserves the next free slot under
+        # the lock, so concurrent requests stay spaced but sleep in parallel
         rate_limit = self.RATE_LIMITS[rate_limit_key]
-        last_request = self._last_request_time[rate_limit_key]
-        now = time.time()
+        with self._rate_limit_lock:
+            now = time.time()
+            slot = max(now, self._last_request_time[rate_limit_key] + rate_limit.get_delay())
+            self._last_request_time[rate_limit_key] = slot
+            self._total_requests += 1
         
-        # Calculate delay needed
-        delay = rate_limit.get_delay() - (now - last_request)
+        delay = slot - now
         if delay > 0:
             logger.debug(f"Rate limiting: sleeping {delay:.2f}s for {rate_limit.endpoint_type}")
             time.sleep(delay)
         
         # Make the request
         url = f"{self.BASE_URL}{endpoint}"
-        self._total_requests += 1
-        self._last_request_time[rate_limit_key] = time.time()
         
         try:
             response = self.session.get(url, params=params, timeout=10)
@@ -240,13 +259,21 @@ class DexscreenerClient:
             
             response.raise_for_status()
             
+            # Decode the raw bytes with orjson rather than response.json()
+            data = orjson.loads(response.content)
+            
             # Reset failure counter on success
-            self._consecutive_failures = 0
-            return response.json()
+            with self._rate_limit_lock:
+                self._consecutive_failures = 0
+            return data
             
+        except orjson.JSONDecodeError as e:
+            self._record_failure()
+            error_msg = f"Invalid JSON response: {str(e)}"
+            logger.error(error_msg)
+            raise DexscreenerError(error_msg)
         except requests.exceptions.RequestException as e:
-            self._consecutive_failures += 1
-            self._failed_requests += 1
+            self._record_failure()
             
             if isinstance(e, requests.exceptions.HTTPError):
                 raise DexscreenerAPIError(
@@ -259,6 +286,12 @@ class DexscreenerClient:
             logger.error(error_msg)
             raise DexscreenerError(error_msg)
 
+    def _record_failure(self) -> None:
+        """Count a failed request."""
+        with self._rate_limit_lock:
+            self._consecutive_failures += 1
+            self._failed_requests += 1
+
     def get_latest_token_profiles(self) -> List[TokenProfile]:
         """
         Get the latest token profiles.
@@ -359,6 +392,82 @@ class DexscreenerClient:
             logger.error(f"Failed to get pairs for token {token_address} on chain {chain_id}: {e}")
             return []
 
+    def get_token_pairs_batch(
+        self,
+        chain_id: str,
+        token_addresses: List[str],
+        max_workers: int = MAX_CONCURRENT_REQUESTS
+    ) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Get all pairs/pools for many tokens on one chain, using one request per
+        MAX_TOKENS_PER_REQUEST addresses instead of one request per token.
+        Chunks are requested concurrently.
+        Rate limit: 300 requests per minute.
+        
+        :param chain_id: Chain identifier (e.g., "solana")
+        :param token_addresses: Token addresses to query
+        :param max_workers: Maximum number of chunk requests in flight
+        :return: Dictionary mapping each requested address to its list of pairs
+        """
+        pairs_by_address: Dict[str, List[Dict[str, Any]]] = {
+            address: [] for address in token_addresses
+        }
+        # EVM addresses may come back with different casing than requested
+        requested = {address.lower(): address for address in token_addresses}
+        
+        chunks = [
+            token_addresses[start:start + self.MAX_TOKENS_PER_REQUEST]
+            for start in range(0, len(token_addresses), self.MAX_TOKENS_PER_REQUEST)
+        ]
+        if len(chunks) > 1 and max_workers > 1:
+            with ThreadPoolExecutor(
+                max_workers=min(max_workers, len(chunks)),
+                thread_name_prefix="dexscreener"
+            ) as executor:
+                chunk_pairs = list(executor.map(
+                    lambda chunk: self._get_pairs_chunk(chain_id, chunk),
+                    chunks
+                ))
+        else:
+            chunk_pairs = [self._get_pairs_chunk(chain_id, chunk) for chunk in chunks]
+        
+        # A pair belongs to every requested token on either side of it
+        for pairs in chunk_pairs:
+            for pair in pairs:
+                if not isinstance(pair, dict):
+                    continue
+                matched = set()
+                for side in ('baseToken', 'quoteToken'):
+                    token = pair.get(side)
+                    if not isinstance(token, dict):
+                        continue
+                    address = requested.get(str(token.get('address', '')).lower())
+                    if address and address not in matched:
+                        matched.add(address)
+                        pairs_by_address[address].append(pair)
+        
+        logger.info(
+            f"Fetched pairs for {len(token_addresses)} tokens on chain {chain_id}: "
+            f"{sum(1 for pairs in pairs_by_address.values() if pairs)} with pairs"
+        )
+        return pairs_by_address
+
+    def _get_pairs_chunk(self, chain_id: str, chunk: List[str]) -> List[Any]:
+        """Request pairs for one chunk of token addresses, logging instead of raising."""
+        try:
+            response = self._make_request(
+                f"/tokens/v1/{chain_id}/{','.join(chunk)}",
+                "pairs"
+            )
+        except Exception as e:
+            logger.error(f"Failed to get pairs for {len(chunk)} tokens on chain {chain_id}: {e}")
+            return []
+        
+        # Handle both possible response formats
+        if isinstance(response, dict):
+            return response.get("pairs") or []
+        return response if isinstance(response, list) else []
+
     def get_pair(self, chain_id: str, pair_id: str) -> Optional[Dict[str, Any]]:
         """
         Get detailed information about a specific pair.
@@ -378,25 +487,39 @@ class DexscreenerClient:
     @property
     def is_healthy(self) -> bool:
         """Check if the service is healthy based on error rates."""
-        return (
-            self._consecutive_failures < 5 and
-            (self._total_requests == 0 or
-             self._failed_requests / self._total_requests < 0.25)
-        )
+        with self._rate_limit_lock:
+            return (
+                self._consecutive_failures < 5 and
+                (self._total_requests == 0 or
+                 self._failed_requests / self._total_requests < 0.25)
+            )
+
+    def close(self) -> None:
+        """Close the HTTP session, unless it was shared in by the caller."""
+        if self._owns_session:
+            self.session.close()
+
+    def __enter__(self) -> 'DexscreenerClient':
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
 
     def get_stats(self) -> Dict[str, Any]:
         """Get service statistics."""
-        return {
-            "total_requests": self._total_requests,
-            "failed_requests": self._failed_requests,
-            "consecutive_failures": self._consecutive_failures,
-            "error_rate": (
-                self._failed_requests / self._total_requests
-                if self._total_requests > 0 else 0
-            ),
-            "is_healthy": self.is_healthy,
-            "last_request_times": self._last_request_time.copy()
-        }
+        is_healthy = self.is_healthy
+        with self._rate_limit_lock:
+            return {
+                "total_requests": self._total_requests,
+                "failed_requests": self._failed_requests,
+                "consecutive_failures": self._consecutive_failures,
+                "error_rate": (
+                    self._failed_requests / self._total_requests
+                    if self._total_requests > 0 else 0
+                ),
+                "is_healthy": is_healthy,
+                "last_request_times": self._last_request_time.copy()
+            }
 
     def get_latest_boosted_tokens(self) -> List[BoostedToken]:
         """
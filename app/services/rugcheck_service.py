@@ -1,9 +1,12 @@
 # app/services/rugcheck_service.py
 
 import logging
+import threading
 from typing import Dict, Any, List, Optional
 import requests
 from dataclasses import dataclass
+from app.core.cache import TTLCache
+from app.core.risk import classify_risk
 
 logger = logging.getLogger(__name__)
 
@@ -38,14 +41,7 @@ class RiskAssessment:
     
     def get_risk_level(self) -> str:
         """Get a human-readable risk level based on score."""
-        if self.score < 500:
-            return "LOW"
-        elif self.score < 750:
-            return "MEDIUM"
-        elif self.score < 1000:
-            return "HIGH"
-        else:
-            return "CRITICAL"
+        return classify_risk(self.score)
 
 class RugcheckError(Exception):
     """Base exception for RugCheck-related errors."""
@@ -86,18 +82,34 @@ class RugcheckService:
         "CRITICAL": (1000, float('inf'))
     }
     
-    def __init__(self, max_risk_score: Optional[int] = None, timeout: int = 10):
+    # Assessment cache defaults; risk scores change slowly
+    DEFAULT_CACHE_TTL_SEC = 3600
+    DEFAULT_CACHE_SIZE = 10000
+    
+    def __init__(
+        self,
+        max_risk_score: Optional[int] = None,
+        timeout: int = 10,
+        session: Optional[requests.Session] = None,
+        cache_ttl_sec: float = DEFAULT_CACHE_TTL_SEC
+    ):
         """
         Initialize the RugCheck service.
         
         :param max_risk_score: Maximum allowed risk score (default: 1000)
         :param timeout: Request timeout in seconds
+        :param session: Optional shared HTTP session to reuse connections
+        :param cache_ttl_sec: How long an assessment is reused before re-querying
         """
         self.max_risk_score = max_risk_score or self.DEFAULT_MAX_SCORE
         self.timeout = timeout
-        self.session = requests.Session()
+        self.session = session or requests.Session()
+        self._owns_session = session is None
+        self._cache = TTLCache(maxsize=self.DEFAULT_CACHE_SIZE, ttl=cache_ttl_sec)
         
-        # Track service health
+        # Track service health; assessments run on a thread pool, so the
+        # counters are only updated under _stats_lock
+        self._stats_lock = threading.Lock()
         self._consecutive_failures = 0
         self._total_requests = 0
         self._failed_requests = 0
@@ -111,6 +123,10 @@ class RugcheckService:
         """
         Perform a detailed risk assessment of a token.
         
+        Assessments are cached per token address for `cache_ttl_sec`, so
+        repeated scheduler cycles don't re-query the API. Failures are not
+        cached.
+        
         :param token_address: The token address to assess
         :return: RiskAssessment object with detailed results
         :raises: RugcheckError on validation/API errors
@@ -118,7 +134,23 @@ class RugcheckService:
         if not token_address:
             raise RugcheckError("No token address provided")
 
-        self._total_requests += 1
+        assessment = self._cache.get(token_address)
+        if assessment is not None:
+            logger.debug(f"Using cached risk assessment for {token_address}")
+            return assessment
+
+        assessment = self._fetch_token_risk(token_address)
+        self._cache.set(token_address, assessment)
+        return assessment
+
+    def clear_cache(self) -> None:
+        """Drop all cached assessments."""
+        self._cache.clear()
+
+    def _fetch_token_risk(self, token_address: str) -> RiskAssessment:
+        """Request a fresh risk assessment from the API."""
+        with self._stats_lock:
+            self._total_requests += 1
         
         try:
             # Construct the URL for the token's risk report
@@ -144,7 +176,8 @@ class RugcheckService:
             )
             
             # Reset failure counter on success
-            self._consecutive_failures = 0
+            with self._stats_lock:
+                self._consecutive_failures = 0
             return assessment
             
         except requests.exceptions.Timeout:
@@ -165,27 +198,42 @@ class RugcheckService:
 
     def _handle_request_failure(self):
         """Handle request failure by updating counters."""
-        self._consecutive_failures += 1
-        self._failed_requests += 1
+        with self._stats_lock:
+            self._consecutive_failures += 1
+            self._failed_requests += 1
 
     @property
     def is_healthy(self) -> bool:
         """Check if the service is healthy."""
-        return (
-            self._consecutive_failures < 5 and
-            (self._total_requests == 0 or
-             self._failed_requests / self._total_requests < 0.25)
-        )
+        with self._stats_lock:
+            return (
+                self._consecutive_failures < 5 and
+                (self._total_requests == 0 or
+                 self._failed_requests / self._total_requests < 0.25)
+            )
+
+    def close(self) -> None:
+        """Close the HTTP session, unless it was shared in by the caller."""
+        if self._owns_session:
+            self.session.close()
+
+    def __enter__(self) -> 'RugcheckService':
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
 
     def get_stats(self) -> Dict[str, Any]:
         """Get service statistics."""
-        return {
-            "total_requests": self._total_requests,
-            "failed_requests": self._failed_requests,
-            "consecutive_failures": self._consecutive_failures,
-            "error_rate": (
-                self._failed_requests / self._total_requests
-                if self._total_requests > 0 else 0
-            ),
-            "is_healthy": self.is_healthy
-        }
+        is_healthy = self.is_healthy
+        with self._stats_lock:
+            return {
+                "total_requests": self._total_requests,
+                "failed_requests": self._failed_requests,
+                "consecutive_failures": self._consecutive_failures,
+                "error_rate": (
+                    self._failed_requests / self._total_requests
+                    if self._total_requests > 0 else 0
+                ),
+                "is_healthy": is_healthy
+            }
@@ -10,19 +10,8 @@ logger = logging.getLogger(__name__)
 
 def format_token_message(snapshot: TokenSnapshot) -> str:
     """Format a token snapshot into a Telegram message."""
-    risk_level = "Unknown"
-    risk_score = None
-    if snapshot.risk_data:
-        risk_score = snapshot.risk_data.get('score')
-        if risk_score is not None:
-            if risk_score < 500:
-                risk_level = "LOW"
-            elif risk_score < 750:
-                risk_level = "MEDIUM"
-            elif risk_score < 1000:
-                risk_level = "HIGH"
-            else:
-                risk_level = "CRITICAL"
+    risk_level = snapshot.risk_level or "Unknown"
+    risk_score = snapshot.risk_data.get('score') if snapshot.risk_data else None
 
     # Format price with natural precision
     price_str = str(Decimal(str(snapshot.price_usd)))
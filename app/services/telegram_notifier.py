@@ -4,6 +4,7 @@ import logging
 from typing import Dict, Any, Optional
 import requests
 import re
+from app.core.http import create_http_session
 from app.services.telegram_types import NotifierConfig
 
 logger = logging.getLogger(__name__)
@@ -11,14 +12,15 @@ logger = logging.getLogger(__name__)
 class TelegramNotifier:
     """Service for sending notifications via Telegram."""
     
-    def __init__(self, config: NotifierConfig):
+    def __init__(self, config: NotifierConfig, session: Optional[requests.Session] = None):
         """
         Initialize the Telegram notifier.
         
         :param config: NotifierConfig instance with required settings
+        :param session: Optional shared HTTP session to reuse connections
         """
         self.config = config
-        self.session = requests.Session()
+        self.session = session or create_http_session()
         self._consecutive_failures = 0
         self._total_requests = 0
         self._failed_requests = 0
@@ -135,11 +137,15 @@ class TelegramNotifier:
         except Exception as e:
             logger.error(f"Error handling message: {e}")
 
-def build_notifier_from_config(config: Dict[str, Any]) -> Optional[TelegramNotifier]:
+def build_notifier_from_config(
+    config: Dict[str, Any],
+    session: Optional[requests.Session] = None
+) -> Optional[TelegramNotifier]:
     """
     Build a TelegramNotifier instance from configuration.
     
     :param config: Configuration dictionary
+    :param session: Optional shared HTTP session to reuse connections
     :return: TelegramNotifier instance or None if disabled/invalid
     """
     telegram_cfg = config.get("telegram", {})
@@ -155,7 +161,7 @@ def build_notifier_from_config(config: Dict[str, Any]) -> Optional[TelegramNotif
             max_retries=telegram_cfg.get("max_retries", 3)
         )
         
-        return TelegramNotifier(notifier_config)
+        return TelegramNotifier(notifier_config, session=session)
         
     except Exception as e:
         logger.error(f"Failed to initialize Telegram notifier: {str(e)}")
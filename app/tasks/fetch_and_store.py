@@ -1,131 +1,205 @@
 # app/tasks/fetch_and_store.py
 
 import logging
+import re
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from typing import Dict, Any, List, Optional, Tuple
-from decimal import Decimal, InvalidOperation
 from dataclasses import dataclass
-from datetime import datetime, timedelta
+from functools import partial
 
+import requests
+from sqlalchemy import select, tuple_
+
+from sqlalchemy.orm import sessionmaker
+
+from app.core.risk import classify_risk
 from app.database.base import SessionLocal
 from app.database.models import TokenSnapshot
-from app.services.dexscreener_client import DexscreenerClient
-from app.services.rugcheck_service import RugcheckService
+from app.database.writer import SnapshotWriter, SnapshotWrite
+from app.services.dexscreener_client import DexscreenerClient, TokenProfile
+from app.services.rugcheck_service import RugcheckService, RiskAssessment
 
 logger = logging.getLogger(__name__)
 
+# Default number of concurrent RugCheck requests
+RUGCHECK_MAX_WORKERS = 8
+
 @dataclass
 class TokenMetrics:
     """Represents validated token metrics."""
     price_usd: Optional[float] = None
     liquidity_usd: Optional[float] = None
     volume_usd: Optional[float] = None
+
+@dataclass(frozen=True)
+class FilterCfg:
+    """Token filter thresholds, resolved once from the `filters` config section."""
+    min_price: float = 0.0
+    max_price: float = float('inf')
+    min_volume: float = 0.0
+    min_liquidity: float = 0.0
     
     @classmethod
-    def from_dict(cls, data: Dict[str, Any]) -> 'TokenMetrics':
-        """Create TokenMetrics from dictionary with validation."""
+    def from_dict(cls, filters: Dict[str, Any]) -> 'FilterCfg':
+        """Create FilterCfg from the `filters` config section."""
         return cls(
-            price_usd=safe_float(data.get('priceUsd')),
-            liquidity_usd=safe_float(data.get('liquidityUsd')),
-            volume_usd=safe_float(data.get('volumeUsd'))
+            min_price=filters.get('min_price_usd', 0.0),
+            max_price=filters.get('max_price_usd', float('inf')),
+            min_volume=filters.get('min_volume_usd', 0.0),
+            min_liquidity=filters.get('min_liquidity_usd', 0.0)
         )
 
+@dataclass(frozen=True)
+class ServiceContext:
+    """Long-lived services and settings shared by every fetch-and-store cycle."""
+    dexscreener: DexscreenerClient
+    rugcheck: Optional[RugcheckService]
+    notifier: Optional[Any]
+    session_factory: sessionmaker
+    filters: FilterCfg
+    rugcheck_max_workers: int = RUGCHECK_MAX_WORKERS
+
+# Plain decimal/scientific notation, optionally followed by a k/m/b suffix
+_NUMERIC_PATTERN = re.compile(r'^[+-]?(?:\d+\.?\d*|\.\d+)(?:e[+-]?\d+)?([kmb]?)$')
+
+_SUFFIX_MULTIPLIERS = {
+    'k': 1_000,
+    'm': 1_000_000,
+    'b': 1_000_000_000
+}
+
 def safe_float(value: Any, default: Optional[float] = None) -> Optional[float]:
     """
-    Safely convert a value to float while preserving precision.
+    Safely convert a value to float.
+    
+    Inputs are checked with cheap type/pattern predicates first, so missing
+    or malformed values return the default without raising internally.
+    Plain ints and floats, the common case for API payloads, are returned
+    directly.
     
     :param value: Value to convert
     :param default: Default value if conversion fails
     :return: Converted float value or default
     """
-    if value is None:
+    if value is None or isinstance(value, bool):
         return default
+    
+    if isinstance(value, (int, float)):
+        return float(value)
+    
+    if isinstance(value, str):
+        # Handle string numbers with common suffixes
+        value = value.strip().lower()
+        match = _NUMERIC_PATTERN.match(value)
+        if not match:
+            return default
         
+        suffix = match.group(1)
+        try:
+            if suffix:
+                return float(value[:-1]) * _SUFFIX_MULTIPLIERS[suffix]
+            return float(value)
+        except (ValueError, TypeError):
+            return default
+    
+    # Uncommon numeric types (e.g. Decimal) fall back to a guarded conversion
     try:
-        if isinstance(value, str):
-            # Handle string numbers with common suffixes
-            value = value.strip().lower()
-            if value.endswith('k'):
-                return float(Decimal(value[:-1]) * 1000)
-            if value.endswith('m'):
-                return float(Decimal(value[:-1]) * 1000000)
-            if value.endswith('b'):
-                return float(Decimal(value[:-1]) * 1000000000)
-        
-        # Use Decimal for precise conversion
-        return float(Decimal(str(value)))
-    except (ValueError, InvalidOperation, TypeError):
+        return float(value)
+    except (ValueError, TypeError):
         return default
 
-def validate_token_data(
-    profile: Dict[str, Any],
-    metrics: TokenMetrics,
-    filters: Dict[str, Any]
-) -> Tuple[bool, Optional[str]]:
+def get_nested_float(
+    data: Dict[str, Any],
+    outer_key: str,
+    inner_key: str,
+    default: Optional[float] = 0.0
+) -> Optional[float]:
     """
-    Validate token data against filters.
+    Read a numeric value nested one level deep, e.g. pair['liquidity']['usd'].
     
-    :param profile: Token profile data
-    :param metrics: Validated token metrics
-    :param filters: Filter configuration
-    :return: Tuple of (is_valid, reason)
+    :param data: Dictionary to read from
+    :param outer_key: Key of the nested dictionary
+    :param inner_key: Key of the value inside the nested dictionary
+    :param default: Default value if missing or not numeric
+    :return: Converted float value or default
     """
-    token_address = profile.get('tokenAddress', 'unknown')
+    try:
+        value = data[outer_key][inner_key]
+    except (KeyError, TypeError, IndexError):
+        # Missing key, or the outer value is not a mapping
+        return default
+    return safe_float(value, default)
+
+def flatten_pairs(pairs: List[Dict[str, Any]]) -> Dict[str, List[Any]]:
+    """
+    Convert a list of pair dictionaries into parallel columns.
     
-    # Required fields check
-    if not token_address or token_address == 'unknown':
-        return False, "Missing token address"
-        
-    # Price validation
-    min_price = filters.get('min_price_usd', 0.0)
-    max_price = filters.get('max_price_usd', float('inf'))
+    Each metric is parsed once (malformed values become 0), so selecting the
+    best pair and reading its metrics are plain list lookups.
     
-    if metrics.price_usd is None:
-        if filters.get('require_price', True):
-            return False, f"Missing price data for {token_address}"
-    else:
-        if not min_price <= metrics.price_usd <= max_price:
-            return False, (
-                f"Price ${metrics.price_usd} outside range "
-                f"${min_price}-${max_price} for {token_address}"
-            )
+    :param pairs: Pair dictionaries from the DexScreener API
+    :return: Dictionary of equally sized columns: pair, price_usd, volume_usd, liquidity_usd
+    """
+    columns: Dict[str, List[Any]] = {
+        'pair': [],
+        'price_usd': [],
+        'volume_usd': [],
+        'liquidity_usd': []
+    }
+    # Bind the hot-loop callables to locals
+    _safe_float = safe_float
+    _get_nested_float = get_nested_float
+    add_pair = columns['pair'].append
+    add_price = columns['price_usd'].append
+    add_volume = columns['volume_usd'].append
+    add_liquidity = columns['liquidity_usd'].append
     
-    # Liquidity validation
-    min_liquidity = filters.get('min_liquidity_usd', 0.0)
-    if metrics.liquidity_usd is None:
-        if filters.get('require_liquidity', True):
-            return False, f"Missing liquidity data for {token_address}"
-    else:
-        if metrics.liquidity_usd < min_liquidity:
-            return False, (
-                f"Liquidity ${metrics.liquidity_usd} below minimum "
-                f"${min_liquidity} for {token_address}"
-            )
+    for pair in pairs:
+        try:
+            price_usd = _safe_float(pair.get('priceUsd'), 0)
+        except AttributeError:
+            # Not a pair dictionary
+            continue
+        add_pair(pair)
+        add_price(price_usd)
+        add_volume(_get_nested_float(pair, 'volume', 'h24'))
+        add_liquidity(_get_nested_float(pair, 'liquidity', 'usd'))
+    return columns
+
+def build_service_context(
+    config: Dict[str, Any],
+    notifier: Optional[Any] = None,
+    http_session: Optional[requests.Session] = None
+) -> ServiceContext:
+    """
+    Build the services used by fetch_and_store_tokens. Meant to be called
+    once per process and reused for every cycle.
     
-    return True, None
+    :param config: Application configuration
+    :param notifier: Optional notifier used for new-token alerts
+    :param http_session: Optional shared HTTP session used by all API clients
+    :return: ServiceContext instance
+    """
+    return ServiceContext(
+        dexscreener=DexscreenerClient(session=http_session),
+        rugcheck=setup_rugcheck_service(config, session=http_session),
+        notifier=notifier,
+        session_factory=SessionLocal,
+        filters=FilterCfg.from_dict(config.get("filters", {})),
+        rugcheck_max_workers=config.get("rugcheck", {}).get("max_workers", RUGCHECK_MAX_WORKERS)
+    )
 
-def fetch_and_store_tokens(config: Dict[str, Any]) -> None:
+def fetch_and_store_tokens(ctx: ServiceContext) -> int:
     """
     Fetch and store token profiles with enhanced validation and filtering.
     Updates existing tokens without sending notifications.
     
-    :param config: Application configuration
+    :param ctx: Long-lived services and settings, see build_service_context
+    :return: Number of token snapshots inserted or updated
     """
-    # Initialize clients
-    dexscreener = DexscreenerClient()
-    rugcheck = setup_rugcheck_service(config)
-    
-    # Initialize Telegram notifier
-    notifier = None
-    if config.get("telegram"):
-        try:
-            from app.services.telegram_notifier import TelegramNotifier, NotifierConfig
-            notifier_config = NotifierConfig(
-                bot_token=config["telegram"]["bot_token"],
-                chat_id=config["telegram"]["chat_id"]
-            )
-            notifier = TelegramNotifier(notifier_config)
-        except Exception as e:
-            logger.error(f"Failed to initialize Telegram notifier: {e}")
+    dexscreener = ctx.dexscreener
+    rugcheck = ctx.rugcheck
+    notifier = ctx.notifier
     
     try:
         # Fetch latest token profiles
@@ -138,255 +212,354 @@ def fetch_and_store_tokens(config: Dict[str, Any]) -> None:
         tokens_stored = 0
         tokens_updated = 0
         
-        with SessionLocal() as session:
-            for profile in profiles:
-                try:
-                    # Log profile data for debugging
-                    logger.info(f"\nProcessing token profile:")
-                    logger.info(f"Token Address: {profile.token_address}")
-                    logger.info(f"Chain ID: {profile.chain_id}")
-                    logger.info(f"Initial Name: {profile.name}")
-                    logger.info(f"Initial Symbol: {profile.symbol}")
-                    
-                    tokens_processed += 1
-                    
-                    # Check if token exists by contract address
-                    existing_token = (
-                        session.query(TokenSnapshot)
-                        .filter(
-                            TokenSnapshot.token_address == profile.token_address,
-                            TokenSnapshot.chain_id == profile.chain_id
-                        )
-                        .first()
+        filters = ctx.filters
+        min_liquidity = filters.min_liquidity
+        
+        # De-duplicate profiles; writes are asynchronous, so a repeated profile
+        # would not see the row queued for its first occurrence
+        unique_profiles = {}
+        for profile in profiles:
+            unique_profiles.setdefault((profile.chain_id, profile.token_address), profile)
+        profiles = list(unique_profiles.values())
+        
+        # Fetch pairs for all tokens up front, batched per chain
+        addresses_by_chain: Dict[str, List[str]] = {}
+        for chain_id, token_address in unique_profiles:
+            addresses_by_chain.setdefault(chain_id, []).append(token_address)
+        
+        pairs_by_key: Dict[Tuple[str, str], List[Dict[str, Any]]] = {}
+        for chain_id, addresses in addresses_by_chain.items():
+            for token_address, token_pairs in dexscreener.get_token_pairs_batch(chain_id, addresses).items():
+                pairs_by_key[(chain_id, token_address)] = token_pairs
+        
+        # Look up all already-stored tokens with a single query
+        existing_ids: Dict[Tuple[str, str], int] = {}
+        if unique_profiles:
+            with ctx.session_factory() as session:
+                rows = session.execute(
+                    select(TokenSnapshot.id, TokenSnapshot.chain_id, TokenSnapshot.token_address)
+                    .where(
+                        tuple_(TokenSnapshot.chain_id, TokenSnapshot.token_address)
+                        .in_(list(unique_profiles))
                     )
-                    
-                    # Extract token data
-                    token_address = profile.token_address
-                    chain_id = profile.chain_id
-                    
-                    logger.debug(f"Fetching pairs for token {token_address} on chain {chain_id}")
-                    # Get token pairs for volume/liquidity data
-                    pairs = dexscreener.get_token_pairs(chain_id, token_address)
-                    
-                    if not pairs:
-                        logger.info(f"❌ Token {token_address} skipped: No pairs found")
-                        tokens_filtered += 1
-                        continue
-                    
-                    # Find the pair with highest liquidity
-                    best_pair = None
-                    max_liquidity = 0
-                    
-                    for pair in pairs:
-                        try:
-                            liquidity = pair.get('liquidity', {})
-                            if isinstance(liquidity, dict):
-                                usd_value = float(liquidity.get('usd', 0) or 0)
-                                if usd_value > max_liquidity:
-                                    max_liquidity = usd_value
-                                    best_pair = pair
-                        except Exception as e:
-                            logger.debug(f"Error processing pair: {e}")
-                            continue
-                    
-                    if not best_pair:
-                        logger.info(f"❌ Token {token_address} skipped: No valid pairs with liquidity")
-                        tokens_filtered += 1
-                        continue
-                    
-                    # Extract metrics with safe conversion
-                    try:
-                        # Extract token information from base token
-                        base_token = best_pair.get('baseToken', {})
-                        token_name = base_token.get('name')
-                        token_symbol = base_token.get('symbol')
-                        
-                        # Update profile with token name and symbol if not already set
-                        if not profile.name and token_name:
-                            profile.name = token_name
-                            logger.info(f"Updated token name to: {token_name}")
-                        if not profile.symbol and token_symbol:
-                            profile.symbol = token_symbol
-                            logger.info(f"Updated token symbol to: {token_symbol}")
-                        
-                        # Get price directly from API response to preserve precision
-                        price_str = best_pair.get('priceUsd', '0')
-                        price_usd = safe_float(price_str, 0)
-                        
-                        volume = best_pair.get('volume', {})
-                        volume_usd = float(volume.get('h24', 0) if isinstance(volume, dict) else 0)
-                        liquidity = best_pair.get('liquidity', {})
-                        liquidity_usd = float(liquidity.get('usd', 0) if isinstance(liquidity, dict) else 0)
-                        
-                        # Format price with its natural precision for logging
-                        price_str = str(Decimal(str(price_usd)))
-                        logger.info(
-                            f"Token metrics:\n"
-                            f"Name: {profile.name} ({profile.symbol})\n"
-                            f"Price USD: ${price_str}\n"
-                            f"Volume USD: ${volume_usd:,.2f}\n"
-                            f"Liquidity USD: ${liquidity_usd:,.2f}"
-                        )
-                    except (ValueError, TypeError) as e:
-                        logger.info(f"❌ Token {token_address} skipped: Error converting metrics: {e}")
-                        tokens_filtered += 1
-                        continue
-                    
-                    # Skip if missing required data
-                    if not all([price_usd, volume_usd, liquidity_usd]):
-                        logger.info(
-                            f"❌ Token {token_address} skipped: Missing required metrics:\n"
-                            f"price=${price_usd:.12f}, volume=${volume_usd:,.2f}, liquidity=${liquidity_usd:,.2f}"
+                    .order_by(TokenSnapshot.id)
+                )
+                for snapshot_id, chain_id, token_address in rows:
+                    existing_ids.setdefault((chain_id, token_address), snapshot_id)
+        
+        # Per-token traces are debug-only; check the level once for the whole run
+        debug_enabled = logger.isEnabledFor(logging.DEBUG)
+        
+        # Pass 1: apply the cheap metric filters to every profile
+        candidates: List[Tuple[TokenProfile, TokenMetrics, Optional[int]]] = []
+        for profile in profiles:
+            try:
+                if debug_enabled:
+                    logger.debug(
+                        "Processing token profile: address=%s chain=%s name=%s symbol=%s",
+                        profile.token_address, profile.chain_id, profile.name, profile.symbol
+                    )
+                
+                tokens_processed += 1
+                
+                # Extract token data
+                token_address = profile.token_address
+                chain_id = profile.chain_id
+                
+                # Check if token exists by contract address
+                existing_id = existing_ids.get((chain_id, token_address))
+                
+                # Token pairs for volume/liquidity data
+                pairs = pairs_by_key.get((chain_id, token_address), [])
+                
+                if not pairs:
+                    if debug_enabled:
+                        logger.debug("❌ Token %s skipped: No pairs found", token_address)
+                    tokens_filtered += 1
+                    continue
+                
+                # Pick the most liquid pair among those meeting the liquidity floor;
+                # pairs below it are dropped before any further work
+                columns = flatten_pairs(pairs)
+                liquidity_column = columns['liquidity_usd']
+                best_idx = max(
+                    (
+                        i for i, liquidity in enumerate(liquidity_column)
+                        if liquidity > 0 and liquidity >= min_liquidity
+                    ),
+                    key=liquidity_column.__getitem__,
+                    default=None
+                )
+                
+                if best_idx is None:
+                    if debug_enabled:
+                        logger.debug(
+                            "❌ Token %s skipped: No pair with liquidity of at least %.2f",
+                            token_address, min_liquidity
                         )
-                        tokens_filtered += 1
-                        continue
-                    
-                    # Apply filters
-                    if not passes_filters(price_usd, volume_usd, liquidity_usd, config):
-                        logger.info(
-                            f"❌ Token {token_address} skipped: Did not pass filters\n"
-                            f"Current values: price=${price_usd:.12f}, volume=${volume_usd:,.2f}, liquidity=${liquidity_usd:,.2f}\n"
-                            f"Filter config: {config.get('filters', {})}"
+                    tokens_filtered += 1
+                    continue
+                
+                # Metrics were already converted when the columns were built
+                price_usd = columns['price_usd'][best_idx]
+                volume_usd = columns['volume_usd'][best_idx]
+                liquidity_usd = liquidity_column[best_idx]
+                
+                # Apply filters (missing metrics fail here as well)
+                if not passes_filters(price_usd, volume_usd, liquidity_usd, filters):
+                    if debug_enabled:
+                        logger.debug(
+                            "❌ Token %s skipped: Did not pass filters: "
+                            "price=%.12f, volume=%.2f, liquidity=%.2f, filter config: %s",
+                            token_address, price_usd, volume_usd, liquidity_usd, filters
                         )
-                        tokens_filtered += 1
-                        continue
+                    tokens_filtered += 1
+                    continue
+                
+                best_pair = columns['pair'][best_idx]
+                
+                # Extract token information from base token
+                base_token = best_pair.get('baseToken')
+                if isinstance(base_token, dict):
+                    token_name = base_token.get('name')
+                    token_symbol = base_token.get('symbol')
                     
-                    # Perform rug check if configured
-                    risk_data = None
-                    if rugcheck:
-                        try:
-                            assessment = rugcheck.assess_token_risk(token_address)
-                            if not assessment.is_safe:
-                                logger.info(
-                                    f"❌ Token {token_address} skipped: Failed rug check\n"
-                                    f"Score: {assessment.score}"
-                                )
-                                tokens_filtered += 1
-                                continue
-                            risk_data = {
-                                'score': assessment.score,
-                                'risks': assessment.risks,
-                                'token_program': assessment.token_program,
-                                'token_type': assessment.token_type
-                            }
-                            logger.debug(f"Risk assessment data: {risk_data}")
-                        except Exception as e:
-                            logger.warning(f"Rug check failed for {token_address}: {e}")
+                    # Update profile with token name and symbol if not already set
+                    if not profile.name and token_name:
+                        profile.name = token_name
+                    if not profile.symbol and token_symbol:
+                        profile.symbol = token_symbol
+                
+                if debug_enabled:
+                    logger.debug(
+                        "Token metrics: name=%s (%s) price=%.12f volume=%.2f liquidity=%.2f",
+                        profile.name, profile.symbol, price_usd, volume_usd, liquidity_usd
+                    )
+                
+                candidates.append((
+                    profile,
+                    TokenMetrics(
+                        price_usd=price_usd,
+                        liquidity_usd=liquidity_usd,
+                        volume_usd=volume_usd
+                    ),
+                    existing_id
+                ))
+                
+            except Exception as e:
+                logger.error(f"Failed to process token profile: {e}", exc_info=True)
+                continue
+        
+        if not rugcheck:
+            # If rugcheck is not configured, skip the tokens
+            if candidates:
+                logger.info(
+                    "❌ %d tokens skipped: Rugcheck service not configured",
+                    len(candidates)
+                )
+            tokens_filtered += len(candidates)
+            candidates = []
+        
+        # Pass 2: assess rug risk for all candidates concurrently and queue the
+        # write for each token as soon as its assessment completes, so the
+        # background writer executes SQL while other assessments are in flight.
+        # Snapshot writes are bulk-executed and committed together on close
+        with SnapshotWriter(session_factory=ctx.session_factory) as writer:
+            with ThreadPoolExecutor(
+                max_workers=ctx.rugcheck_max_workers,
+                thread_name_prefix="rugcheck"
+            ) as executor:
+                futures = {
+                    executor.submit(safe_assess_token_risk, rugcheck, candidate[0].token_address): candidate
+                    for candidate in candidates
+                }
+                for future in as_completed(futures):
+                    profile, metrics, existing_id = futures[future]
+                    assessment = future.result()
+                    try:
+                        token_address = profile.token_address
+                        price_usd = metrics.price_usd
+                        volume_usd = metrics.volume_usd
+                        liquidity_usd = metrics.liquidity_usd
+                        
+                        if assessment is None:
                             # Skip tokens where rugcheck fails
-                            logger.info(f"❌ Token {token_address} skipped: Unable to assess risk")
+                            if debug_enabled:
+                                logger.debug("❌ Token %s skipped: Unable to assess risk", token_address)
                             tokens_filtered += 1
                             continue
-                    else:
-                        # If rugcheck is not configured, skip the token
-                        logger.info(f"❌ Token {token_address} skipped: Rugcheck service not configured")
-                        tokens_filtered += 1
-                        continue
-                    
-                    try:
-                        if existing_token:
-                            # Update existing token
-                            existing_token.price_usd = price_usd
-                            existing_token.volume_usd = volume_usd
-                            existing_token.liquidity_usd = liquidity_usd
-                            existing_token.risk_data = risk_data
-                            existing_token.timestamp = datetime.now()
-                            session.commit()
+                        if not assessment.is_safe:
+                            if debug_enabled:
+                                logger.debug(
+                                    "❌ Token %s skipped: Failed rug check, score %s",
+                                    token_address, assessment.score
+                                )
+                            tokens_filtered += 1
+                            continue
+                        risk_data = {
+                            'score': assessment.score,
+                            'risks': assessment.risks,
+                            'token_program': assessment.token_program,
+                            'token_type': assessment.token_type
+                        }
+                        if debug_enabled:
+                            logger.debug("Risk assessment data: %s", risk_data)
+                        
+                        # Every snapshot is upserted on (chain_id, token_address); the
+                        # prefetched ids only decide which tokens count as new
+                        snapshot_values = TokenSnapshot.values_from_token_profile(
+                            profile=profile,
+                            price_usd=price_usd,
+                            volume_usd=volume_usd,
+                            liquidity_usd=liquidity_usd,
+                            risk_data=risk_data
+                        )
+                        
+                        if existing_id is not None:
+                            # Queue update of the existing token
+                            writer.put(SnapshotWrite(values=snapshot_values))
                             tokens_updated += 1
                             logger.info(
-                                f"✅ Successfully updated token {profile.name} ({profile.symbol}):\n"
-                                f"Token: {token_address}\n"
-                                f"Price: ${price_usd:.12f}\n"
-                                f"Volume: ${volume_usd:,.2f}\n"
-                                f"Liquidity: ${liquidity_usd:,.2f}"
+                                "✅ Queued update for token %s", token_address,
+                                extra={
+                                    "event": "token_updated",
+                                    "token": token_address,
+                                    "symbol": profile.symbol,
+                                    "price": price_usd,
+                                    "volume": volume_usd,
+                                    "liquidity": liquidity_usd
+                                }
                             )
                         else:
-                            # Create new token snapshot
-                            snapshot = TokenSnapshot.from_token_profile(
-                                profile=profile,
-                                price_usd=price_usd,
-                                volume_usd=volume_usd,
-                                liquidity_usd=liquidity_usd,
-                                risk_data=risk_data
-                            )
-                            
-                            session.add(snapshot)
-                            session.commit()
+                            # Send Telegram notification only for new tokens, once stored
+                            on_commit = None
+                            if notifier:
+                                on_commit = partial(
+                                    notify_new_token,
+                                    notifier,
+                                    profile,
+                                    price_usd,
+                                    volume_usd,
+                                    liquidity_usd,
+                                    risk_data
+                                )
                             
+                            writer.put(SnapshotWrite(values=snapshot_values, on_commit=on_commit))
                             tokens_stored += 1
                             logger.info(
-                                f"✅ Successfully stored new token {profile.name} ({profile.symbol}):\n"
-                                f"Token: {token_address}\n"
-                                f"Price: ${price_usd:.12f}\n"
-                                f"Volume: ${volume_usd:,.2f}\n"
-                                f"Liquidity: ${liquidity_usd:,.2f}"
+                                "✅ Queued new token %s", token_address,
+                                extra={
+                                    "event": "token_stored",
+                                    "token": token_address,
+                                    "symbol": profile.symbol,
+                                    "price": price_usd,
+                                    "volume": volume_usd,
+                                    "liquidity": liquidity_usd
+                                }
                             )
-
-                            # Send Telegram notification only for new tokens
-                            if notifier:
-                                risk_level = "Unknown"
-                                risk_score = None
-                                if risk_data:
-                                    risk_score = risk_data.get('score')
-                                    if risk_score is not None:
-                                        if risk_score < 500:
-                                            risk_level = "LOW"
-                                        elif risk_score < 750:
-                                            risk_level = "MEDIUM"
-                                        elif risk_score < 1000:
-                                            risk_level = "HIGH"
-                                        else:
-                                            risk_level = "CRITICAL"
-
-                                # Format price with natural precision
-                                price_str = str(Decimal(str(price_usd)))
-                                
-                                message = (
-                                    f"<b>🔥 New Token Alert</b>\n\n"
-                                    f"<b>Token:</b> {profile.name} ({profile.symbol})\n"
-                                    f"<b>Address:</b> <code>{token_address}</code>\n"
-                                    f"<b>Chain:</b> {chain_id}\n"
-                                    f"<b>Price:</b> ${price_str}\n"
-                                    f"<b>Volume:</b> ${volume_usd:,.2f}\n"
-                                    f"<b>Liquidity:</b> ${liquidity_usd:,.2f}\n"
-                                    f"<b>Risk Level:</b> {risk_level}"
-                                )
-                                
-                                if risk_score is not None:
-                                    message += f" ({risk_score})"
-                                    
-                                if profile.url:
-                                    message += f"\n\n<b>Chart:</b> <a href='{profile.url}'>View on DexScreener</a>"
-
-                                try:
-                                    notifier.send_message(message)
-                                except Exception as e:
-                                    logger.error(f"Failed to send Telegram notification: {e}")
-
+                        
                     except Exception as e:
-                        logger.error(f"Failed to create or update token: {e}")
+                        logger.error(f"Failed to process token profile: {e}", exc_info=True)
                         continue
-                    
-                except Exception as e:
-                    logger.error(f"Failed to process token profile: {e}", exc_info=True)
-                    continue
         
         # Log summary statistics
-        logger.info(f"\nToken Processing Summary:")
-        logger.info(f"Total Processed: {tokens_processed}")
-        logger.info(f"Updated: {tokens_updated}")
-        logger.info(f"Filtered Out: {tokens_filtered}")
-        logger.info(f"New Tokens Stored: {tokens_stored}")
+        logger.info(
+            "Token processing summary: processed=%d updated=%d filtered=%d stored=%d",
+            tokens_processed, tokens_updated, tokens_filtered, tokens_stored,
+            extra={
+                "event": "fetch_summary",
+                "processed": tokens_processed,
+                "updated": tokens_updated,
+                "filtered": tokens_filtered,
+                "stored": tokens_stored
+            }
+        )
+        if writer.failed:
+            logger.error(
+                "Failed writes: %d", writer.failed,
+                extra={"event": "write_failures", "failed": writer.failed}
+            )
+        
+        return writer.written
                     
     except Exception as e:
         logger.error(f"Failed to fetch and store tokens: {e}", exc_info=True)
         raise
 
-def setup_rugcheck_service(config: Dict[str, Any]) -> Optional[RugcheckService]:
+def notify_new_token(
+    notifier: Any,
+    profile: TokenProfile,
+    price_usd: float,
+    volume_usd: float,
+    liquidity_usd: float,
+    risk_data: Optional[Dict[str, Any]]
+) -> None:
+    """
+    Send a Telegram alert for a newly stored token.
+    
+    :param notifier: Any object with a send_message method
+    :param profile: Token profile of the stored token
+    :param price_usd: Current price in USD
+    :param volume_usd: 24h volume in USD
+    :param liquidity_usd: Liquidity in USD
+    :param risk_data: Optional risk assessment data
+    """
+    risk_score = risk_data.get('score') if risk_data else None
+    risk_level = classify_risk(risk_score) or "Unknown"
+
+    # Format price with natural precision
+    price_str = f"{price_usd:.12g}"
+    
+    message = (
+        f"<b>🔥 New Token Alert</b>\n\n"
+        f"<b>Token:</b> {profile.name} ({profile.symbol})\n"
+        f"<b>Address:</b> <code>{profile.token_address}</code>\n"
+        f"<b>Chain:</b> {profile.chain_id}\n"
+        f"<b>Price:</b> ${price_str}\n"
+        f"<b>Volume:</b> ${volume_usd:,.2f}\n"
+        f"<b>Liquidity:</b> ${liquidity_usd:,.2f}\n"
+        f"<b>Risk Level:</b> {risk_level}"
+    )
+    
+    if risk_score is not None:
+        message += f" ({risk_score})"
+        
+    if profile.url:
+        message += f"\n\n<b>Chart:</b> <a href='{profile.url}'>View on DexScreener</a>"
+
+    try:
+        notifier.send_message(message)
+    except Exception as e:
+        logger.error(f"Failed to send Telegram notification: {e}")
+
+def safe_assess_token_risk(
+    rugcheck: RugcheckService,
+    token_address: str
+) -> Optional[RiskAssessment]:
+    """
+    Assess token risk for use in a worker thread, logging instead of raising.
+    
+    :param rugcheck: RugCheck service
+    :param token_address: The token address to assess
+    :return: RiskAssessment, or None if the assessment failed
+    """
+    try:
+        return rugcheck.assess_token_risk(token_address)
+    except Exception as e:
+        logger.warning(f"Rug check failed for {token_address}: {e}")
+        return None
+
+def setup_rugcheck_service(
+    config: Dict[str, Any],
+    session: Optional[requests.Session] = None
+) -> Optional[RugcheckService]:
     """Setup RugCheck service if configured."""
     rugcheck_cfg = config.get("rugcheck", {})
     if rugcheck_cfg:
         return RugcheckService(
-            max_risk_score=rugcheck_cfg.get("max_risk_score", 1000)
+            max_risk_score=rugcheck_cfg.get("max_risk_score", 1000),
+            session=session,
+            cache_ttl_sec=rugcheck_cfg.get("cache_ttl_sec", RugcheckService.DEFAULT_CACHE_TTL_SEC)
         )
     return None
 
@@ -394,25 +567,29 @@ def passes_filters(
     price_usd: float,
     volume_usd: float,
     liquidity_usd: float,
-    config: Dict[str, Any]
+    filters: FilterCfg
 ) -> bool:
-    """Check if token passes configured filters."""
-    filters = config.get("filters", {})
+    """
+    Check if token passes configured filters.
+    
+    Missing metrics (None, or 0, which is what unparseable values become)
+    and negative ones always fail, regardless of the configured minimums.
+    """
+    if price_usd is None or volume_usd is None or liquidity_usd is None:
+        return False
+    if price_usd <= 0 or volume_usd <= 0 or liquidity_usd <= 0:
+        return False
     
     # Price filter
-    min_price = filters.get("min_price_usd", 0)
-    max_price = filters.get("max_price_usd", float('inf'))
-    if not (min_price <= price_usd <= max_price):
+    if not (filters.min_price <= price_usd <= filters.max_price):
         return False
     
     # Volume filter
-    min_volume = filters.get("min_volume_usd", 0)
-    if volume_usd < min_volume:
+    if volume_usd < filters.min_volume:
         return False
     
     # Liquidity filter
-    min_liquidity = filters.get("min_liquidity_usd", 0)
-    if liquidity_usd < min_liquidity:
+    if liquidity_usd < filters.min_liquidity:
         return False
     
     return True
@@ -4,10 +4,14 @@ import time
 import logging
 import signal
 import sys
-from datetime import datetime, timedelta
-from typing import Dict, Any, Optional
+from datetime import timedelta
+from typing import Dict, Any, List, Optional
 from dataclasses import dataclass
-from app.tasks.fetch_and_store import fetch_and_store_tokens
+from concurrent.futures import ThreadPoolExecutor
+from collections import ChainMap
+import requests
+from app.core.http import create_http_session
+from app.tasks.fetch_and_store import fetch_and_store_tokens, build_service_context
 from app.services.analysis import analyze_pumped_tokens
 from app.database.base import SessionLocal
 from app.services.telegram_notifier import TelegramNotifier, NotifierConfig
@@ -15,19 +19,72 @@ import threading
 
 logger = logging.getLogger(__name__)
 
+# getUpdates long-poll: Telegram holds the request open for up to
+# POLL_TIMEOUT_SEC, so the client must wait a little longer than that
+POLL_TIMEOUT_SEC = 50
+POLL_HTTP_TIMEOUT_SEC = 55
+
+# Alerts of one analysis cycle are coalesced into digest messages; Telegram
+# caps messages at 4096 characters
+DIGEST_MAX_CHARS = 4000
+DIGEST_SEPARATOR = "\n\n―――\n\n"
+DEFAULT_DIGEST_BATCH_SIZE = 10
+
+# Pump alert for one flagged token, filled from analyze_pumped_tokens results
+_ALERT_TEMPLATE = (
+    "🚀 <b>Token Alert</b>\n\n"
+    "<b>Token:</b> <code>{token_address}</code>\n"
+    "<b>Price Change:</b> +{price_change_percent:.2f}%\n"
+    "<b>Current Price:</b> ${current_price:.8f}\n"
+    "<b>Volume:</b> ${volume_usd:,.0f}\n"
+    "<b>Liquidity:</b> ${liquidity_usd:,.0f}\n"
+    "<b>Risk Level:</b> {risk_level}\n"
+    "<b>Chart:</b> <a href='{dexscreener_url}'>View on DexScreener</a>"
+)
+_ALERT_DEFAULTS = {"liquidity_usd": 0, "risk_level": "Unknown"}
+
+def build_digests(
+    messages: List[str],
+    batch_size: int = DEFAULT_DIGEST_BATCH_SIZE,
+    max_chars: int = DIGEST_MAX_CHARS
+) -> List[str]:
+    """
+    Join messages into as few digests as possible.
+    
+    :param messages: Individual alert messages, in sending order
+    :param batch_size: Maximum number of messages per digest
+    :param max_chars: Maximum digest length; a longer single message is sent alone
+    :return: List of digest messages
+    """
+    digests: List[str] = []
+    current: List[str] = []
+    length = 0
+    for message in messages:
+        added = len(message) + (len(DIGEST_SEPARATOR) if current else 0)
+        if current and (len(current) >= batch_size or length + added > max_chars):
+            digests.append(DIGEST_SEPARATOR.join(current))
+            current, length = [], 0
+            added = len(message)
+        current.append(message)
+        length += added
+    if current:
+        digests.append(DIGEST_SEPARATOR.join(current))
+    return digests
+
 @dataclass
 class SchedulerHealth:
     """Track scheduler health metrics."""
-    last_successful_run: Optional[datetime] = None
+    # Monotonic clock readings (time.monotonic_ns); immune to wall-clock jumps
+    last_successful_run_ns: Optional[int] = None
     consecutive_failures: int = 0
     total_failures: int = 0
     last_error: Optional[str] = None
     is_running: bool = False
-    start_time: Optional[datetime] = None
+    start_time_ns: Optional[int] = None
     
     def record_success(self) -> None:
         """Record a successful run."""
-        self.last_successful_run = datetime.now()
+        self.last_successful_run_ns = time.monotonic_ns()
         self.consecutive_failures = 0
     
     def record_failure(self, error: str) -> None:
@@ -39,8 +96,15 @@ class SchedulerHealth:
     @property
     def uptime(self) -> Optional[timedelta]:
         """Get scheduler uptime."""
-        if self.start_time:
-            return datetime.now() - self.start_time
+        if self.start_time_ns is not None:
+            return timedelta(microseconds=(time.monotonic_ns() - self.start_time_ns) // 1000)
+        return None
+    
+    @property
+    def since_last_success(self) -> Optional[timedelta]:
+        """Get time elapsed since the last successful run."""
+        if self.last_successful_run_ns is not None:
+            return timedelta(microseconds=(time.monotonic_ns() - self.last_successful_run_ns) // 1000)
         return None
 
 class SchedulerError(Exception):
@@ -50,11 +114,24 @@ class SchedulerError(Exception):
 class TaskRunner:
     """Handles individual task execution with error handling."""
     
-    def __init__(self, config: Dict[str, Any]):
+    def __init__(self, config: Dict[str, Any], http_session: Optional[requests.Session] = None):
         self.config = config
+        self.http_session = http_session
         self.notifier = self._setup_notifier()
+        # Built once and reused by every fetch_and_store cycle
+        self.services = build_service_context(
+            config,
+            notifier=self.notifier,
+            http_session=http_session
+        )
         self._should_stop = False
         self._message_thread = None
+        # Notifications are delivered in order on one background worker, so
+        # Telegram round trips overlap with the cycle instead of blocking it
+        self._notify_executor = ThreadPoolExecutor(
+            max_workers=1,
+            thread_name_prefix="tg-send"
+        )
     
     def _setup_notifier(self) -> Optional[TelegramNotifier]:
         """Setup Telegram notifier if configured."""
@@ -67,41 +144,61 @@ class TaskRunner:
                     timeout=tconf.get("timeout", 10),
                     max_retries=tconf.get("max_retries", 3)
                 )
-                return TelegramNotifier(config)
+                return TelegramNotifier(config, session=self.http_session)
         except Exception as e:
             logger.error(f"Failed to setup notifier: {e}")
         return None
 
     def start_message_handler(self) -> None:
-        """Start the message handling thread."""
-        if self.notifier:
-            self._message_thread = threading.Thread(
-                target=self._message_loop,
-                daemon=True
-            )
-            self._message_thread.start()
+        """
+        Start the message handling thread, unless it is already running.
+        
+        A daemon thread is used rather than an executor worker: executor
+        threads are joined at interpreter exit, which would hold shutdown
+        until the pending getUpdates long poll returns.
+        """
+        if not self.notifier:
+            return
+        if self._message_thread and self._message_thread.is_alive():
+            return
+        self._should_stop = False
+        self._message_thread = threading.Thread(
+            target=self._message_loop,
+            name="tg-poll",
+            daemon=True
+        )
+        self._message_thread.start()
     
     def stop_message_handler(self) -> None:
-        """Stop the message handling thread."""
+        """Stop the message handling thread, waiting briefly for it to exit."""
         self._should_stop = True
         if self._message_thread:
             self._message_thread.join(timeout=5.0)
+            if not self._message_thread.is_alive():
+                self._message_thread = None
     
     def _message_loop(self) -> None:
         """Background thread to handle incoming messages."""
         if not self.notifier:
             return
             
+        # The long poll gets its own session without transport retries: the
+        # loop below already retries, and a retried poll would hold this
+        # thread for several poll timeouts
+        poll_session = create_http_session(pool_connections=1, pool_maxsize=1, max_retries=0)
         last_update_id = 0
         while not self._should_stop:
             try:
                 # Get updates from Telegram
-                response = self.notifier.session.get(
+                response = poll_session.get(
                     f"https://api.telegram.org/bot{self.notifier.config.bot_token}/getUpdates",
                     params={
                         "offset": last_update_id + 1,
-                        "timeout": 30
-                    }
+                        "timeout": POLL_TIMEOUT_SEC,
+                        # Only messages are handled; skip every other update type
+                        "allowed_updates": '["message"]'
+                    },
+                    timeout=POLL_HTTP_TIMEOUT_SEC
                 )
                 
                 if response.ok:
@@ -113,17 +210,24 @@ class TaskRunner:
                                 self.notifier.handle_message(update["message"])
                             last_update_id = update["update_id"]
                 
-                time.sleep(1)  # Small delay to prevent hammering the API
+                # No sleep here: the long poll itself blocks until an update
+                # arrives or the timeout expires
                 
             except Exception as e:
                 logger.error(f"Error in message loop: {e}")
                 time.sleep(5)  # Longer delay on error
+        
+        poll_session.close()
     
-    def run_fetch_and_store(self) -> None:
-        """Run the fetch and store task with error handling."""
+    def run_fetch_and_store(self) -> int:
+        """
+        Run the fetch and store task with error handling.
+        
+        :return: Number of token snapshots inserted or updated
+        """
         try:
             logger.info("Starting fetch_and_store_tokens cycle...")
-            fetch_and_store_tokens(self.config)
+            return fetch_and_store_tokens(self.services)
         except Exception as e:
             error_msg = f"Error in fetch_and_store_tokens: {str(e)}"
             logger.exception(error_msg)
@@ -143,18 +247,17 @@ class TaskRunner:
                 )
                 
                 if flagged_tokens:
-                    for token in flagged_tokens:
-                        message = (
-                            f"🚀 <b>Token Alert</b>\n\n"
-                            f"<b>Token:</b> <code>{token['token_address']}</code>\n"
-                            f"<b>Price Change:</b> +{token['price_change_percent']:.2f}%\n"
-                            f"<b>Current Price:</b> ${token['current_price']:.8f}\n"
-                            f"<b>Volume:</b> ${token['volume_usd']:,.0f}\n"
-                            f"<b>Liquidity:</b> ${token.get('liquidity_usd', 0):,.0f}\n"
-                            f"<b>Risk Level:</b> {token.get('risk_level', 'Unknown')}\n"
-                            f"<b>Chart:</b> <a href='{token['dexscreener_url']}'>View on DexScreener</a>"
-                        )
-                        self.send_notification(message)
+                    messages = [
+                        _ALERT_TEMPLATE.format_map(ChainMap(token, _ALERT_DEFAULTS))
+                        for token in flagged_tokens
+                    ]
+                    
+                    # One request per digest instead of one per token
+                    batch_size = self.config.get("telegram", {}).get(
+                        "batch_size", DEFAULT_DIGEST_BATCH_SIZE
+                    )
+                    for digest in build_digests(messages, batch_size=batch_size):
+                        self.send_notification(digest)
         except Exception as e:
             error_msg = f"Error in analysis cycle: {str(e)}"
             logger.exception(error_msg)
@@ -162,13 +265,26 @@ class TaskRunner:
             raise SchedulerError(error_msg)
 
     def send_notification(self, message: str) -> None:
-        """Send a notification message."""
-        logger.info(f"NOTIFICATION => {message}")
+        """Queue a notification message for background delivery."""
+        # Lazy formatting: digests can be several KB and are rarely logged in production
+        logger.info("NOTIFICATION => %s", message)
         if self.notifier:
             try:
-                self.notifier.send_message(message)
-            except Exception as e:
-                logger.error(f"Failed to send notification: {e}")
+                self._notify_executor.submit(self._deliver_notification, message)
+            except RuntimeError:
+                # Executor already shut down; deliver inline
+                self._deliver_notification(message)
+
+    def _deliver_notification(self, message: str) -> None:
+        """Send a notification message, logging instead of raising."""
+        try:
+            self.notifier.send_message(message)
+        except Exception as e:
+            logger.error(f"Failed to send notification: {e}")
+
+    def flush_notifications(self) -> None:
+        """Deliver all queued notifications and stop the delivery worker."""
+        self._notify_executor.shutdown(wait=True)
 
     def notify_error(self, error_msg: str) -> None:
         """Send error notification."""
@@ -190,7 +306,12 @@ class Scheduler:
         self.max_consecutive_failures = max_consecutive_failures
         self.error_cooldown_sec = error_cooldown_sec
         self.health = SchedulerHealth()
-        self.task_runner = TaskRunner(config)
+        # One pooled HTTP session for the whole process, so connections to
+        # DexScreener, RugCheck and Telegram are kept alive between cycles
+        self.http_session = create_http_session()
+        self.task_runner = TaskRunner(config, http_session=self.http_session)
+        # Set on shutdown to interrupt any pending wait immediately
+        self._stop = threading.Event()
         self._setup_signal_handlers()
     
     def _setup_signal_handlers(self) -> None:
@@ -199,23 +320,34 @@ class Scheduler:
         signal.signal(signal.SIGTERM, self._handle_shutdown)
     
     def _handle_shutdown(self, signum: int, frame: Any) -> None:
-        """Handle shutdown signals gracefully."""
+        """
+        Handle shutdown signals gracefully.
+        
+        Only flags the loop to stop: the handler interrupts the main thread at
+        an arbitrary point, so taking locks here (executor, cache) could
+        deadlock. Cleanup and the shutdown notification happen in run().
+        """
         logger.info("Received shutdown signal, stopping scheduler...")
         self.health.is_running = False
-        # Notify about shutdown
-        self.task_runner.send_notification("🔄 Bot is shutting down...")
+        self._stop.set()
     
     def run(self) -> None:
         """Run the scheduler with enhanced error handling and recovery."""
         self.health.is_running = True
-        self.health.start_time = datetime.now()
+        self.health.start_time_ns = time.monotonic_ns()
         self.task_runner.send_notification("🟢 Bot started successfully!")
         
         try:
             # Start message handler
             self.task_runner.start_message_handler()
             
+            # Cycles are scheduled against a monotonic deadline, so cycle
+            # duration and backoff don't add up and drift the cadence
+            next_run = time.monotonic()
             while self.health.is_running:
+                # A cycle that overran its slot reschedules from now instead of
+                # firing the missed runs back to back
+                next_run = max(next_run, time.monotonic()) + self.interval_sec
                 try:
                     self._run_cycle()
                     self.health.record_success()
@@ -224,8 +356,14 @@ class Scheduler:
                     self.health.record_failure(str(e))
                     
                     if self.health.consecutive_failures >= self.max_consecutive_failures:
+                        since_success = self.health.since_last_success
+                        last_success = (
+                            f"{timedelta(seconds=round(since_success.total_seconds()))} ago"
+                            if since_success is not None else "never"
+                        )
                         error_msg = (
                             f"⛔ Critical: {self.max_consecutive_failures} consecutive failures. "
+                            f"Last success: {last_success}. "
                             f"Last error: {self.health.last_error}"
                         )
                         logger.error(error_msg)
@@ -233,7 +371,8 @@ class Scheduler:
                         # Add exponential backoff for recovery
                         cooldown = self.error_cooldown_sec * (2 ** (self.health.consecutive_failures - 1))
                         logger.info(f"Backing off for {cooldown} seconds before retry...")
-                        time.sleep(cooldown)
+                        # The backoff replaces the regular wait rather than adding to it
+                        next_run = max(next_run, time.monotonic() + cooldown)
                     
                 except Exception as e:
                     error_msg = f"Unexpected error in scheduler: {str(e)}"
@@ -241,21 +380,33 @@ class Scheduler:
                     self.health.record_failure(error_msg)
                     self.task_runner.notify_error(error_msg)
                 
-                # Sleep until next cycle
-                logger.info(f"Scheduler sleeping for {self.interval_sec} seconds.")
-                time.sleep(self.interval_sec)
+                # Wait until the next cycle is due
+                wait_sec = max(0.0, next_run - time.monotonic())
+                logger.info("Scheduler sleeping for %.0f seconds.", wait_sec)
+                if self._stop.wait(wait_sec):
+                    break
             
         except KeyboardInterrupt:
             logger.info("Shutting down scheduler...")
         finally:
             self.task_runner.stop_message_handler()
+            # Cached risk assessments must not outlive this run
+            if self.task_runner.services.rugcheck:
+                self.task_runner.services.rugcheck.clear_cache()
+            # Notify about shutdown
+            self.task_runner.send_notification("🔄 Bot is shutting down...")
+            self.task_runner.flush_notifications()
+            self.http_session.close()
         
         logger.info("Scheduler stopped.")
     
     def _run_cycle(self) -> None:
         """Run a single scheduler cycle."""
-        self.task_runner.run_fetch_and_store()
-        self.task_runner.run_analysis()
+        # Analysis only looks at stored snapshots; without writes it has nothing new
+        if self.task_runner.run_fetch_and_store():
+            self.task_runner.run_analysis()
+        else:
+            logger.info("No token snapshots written, skipping analysis.")
 
 def run_scheduler(config: Dict[str, Any], interval_sec: int = 600) -> None:
     """
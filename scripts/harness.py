@@ -0,0 +1,56 @@
+"""
+Shared harness for the API test scripts: result type, test runner and
+summary reporting.
+"""
+
+import sys
+import logging
+from operator import attrgetter, countOf
+from typing import Any, Callable, Dict, List, NamedTuple, Optional
+
+import orjson
+
+def to_json(obj: Any) -> str:
+    """Pretty-print a payload as JSON for debug logs."""
+    return orjson.dumps(obj, option=orjson.OPT_INDENT_2, default=str).decode()
+
+class TestResult(NamedTuple):
+    """Represents the result of a test case."""
+    name: str
+    passed: bool
+    error: Optional[str] = None
+    debug_info: Optional[Dict[str, Any]] = None
+
+def run_test(name: str, test_func: Callable[..., Optional[Dict[str, Any]]], *args: Any) -> TestResult:
+    """Run a test with the given arguments and return its result."""
+    try:
+        debug_info = test_func(*args)
+        return TestResult(name=name, passed=True, debug_info=debug_info)
+    except Exception as e:
+        return TestResult(name=name, passed=False, error=str(e))
+
+def report_summary(logger: logging.Logger, results: List[TestResult]) -> None:
+    """
+    Log the test summary and exit with status 1 if any test failed.
+
+    :param logger: Logger of the calling script
+    :param results: Results of every test that was run
+    """
+    total = len(results)
+    passed = countOf(map(attrgetter('passed'), results), True)
+    failed = total - passed
+
+    logger.info("\nTest Summary:")
+    logger.info(f"Total Tests: {total}")
+    logger.info(f"Passed: {passed}")
+    logger.info(f"Failed: {failed}")
+
+    # Print failed tests if any
+    if failed > 0:
+        logger.info("\nFailed Tests:")
+        for result in results:
+            if not result.passed:
+                logger.info(f"- {result.name}: {result.error}")
+        sys.exit(1)
+
+    logger.info("\n✨ All tests passed successfully!")
@@ -2,19 +2,16 @@
 """
 Script to test DexScreener API functionality.
 Tests token profile fetching and pair data retrieval.
+
+Run from the repository root with: python -m scripts.test_dexscreener
 """
 
-import sys
-import os
 import logging
-import json
-from typing import Optional, Dict, Any, List
-from dataclasses import dataclass, asdict
-
-# Add the app directory to the Python path
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from typing import Dict, Any
+from dataclasses import asdict
 
 from app.services.dexscreener_client import DexscreenerClient, TokenLink, TokenProfile
+from scripts.harness import TestResult, report_summary, run_test, to_json
 
 # Configure logging
 logging.basicConfig(
@@ -25,40 +22,15 @@ logger = logging.getLogger(__name__)
 
 def serialize_profile(profile: TokenProfile) -> Dict[str, Any]:
     """Convert a TokenProfile to a serializable dictionary."""
-    data = {
-        "url": profile.url,
-        "chain_id": profile.chain_id,
-        "token_address": profile.token_address,
-        "icon": profile.icon,
-        "header": profile.header,
-        "open_graph": profile.open_graph,
-        "description": profile.description,
-        "links": [
-            {
-                "url": link.url,
-                "type": link.type,
-                "label": link.label
-            }
-            for link in (profile.links or [])
-        ]
-    }
+    data = asdict(profile)
+    # links defaults to None on the dataclass; keep the serialized shape a list
+    data["links"] = data["links"] or []
     return data
 
-@dataclass
-class TestResult:
-    """Represents the result of a test case."""
-    name: str
-    passed: bool
-    error: Optional[str] = None
-    debug_info: Optional[Dict[str, Any]] = None
-
-def run_test(name: str, test_func) -> TestResult:
-    """Run a test and return its result."""
-    try:
-        debug_info = test_func()
-        return TestResult(name=name, passed=True, debug_info=debug_info)
-    except Exception as e:
-        return TestResult(name=name, passed=False, error=str(e))
+def log_debug_info(result: TestResult) -> None:
+    """Log a test's debug info; serialized only when DEBUG logging is enabled."""
+    if result.debug_info and logger.isEnabledFor(logging.DEBUG):
+        logger.debug("Debug Info: %s", to_json(result.debug_info))
 
 def test_get_latest_profiles(client: DexscreenerClient) -> Dict[str, Any]:
     """Test fetching latest token profiles."""
@@ -100,7 +72,8 @@ def test_get_token_pairs(client: DexscreenerClient, profile: Dict[str, Any]) ->
     pairs = client.get_token_pairs(profile["chain_id"], profile["token_address"])
     
     # Log the raw response for debugging
-    logger.debug(f"Raw pairs response: {json.dumps(pairs, indent=2)}")
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("Raw pairs response: %s", to_json(pairs))
     
     # Extract token information from the first pair if available
     token_info = {}
@@ -117,8 +90,7 @@ def test_get_token_pairs(client: DexscreenerClient, profile: Dict[str, Any]) ->
         "chain_id": profile["chain_id"],
         "token_info": token_info,
         "total_pairs": len(pairs),
-        "sample_pair": pairs[0] if pairs else None,
-        "raw_response": pairs
+        "sample_pair": pairs[0] if pairs else None
     }
     
     # Don't raise exception if no pairs, just log it
@@ -174,82 +146,61 @@ def main():
     """Run all DexScreener API tests."""
     logger.info("Starting DexScreener API Tests")
     
-    # Initialize client
-    client = DexscreenerClient()
-    
-    # Store test profile for reuse
-    test_profile = None
-    
-    # Define test cases
-    tests = [
-        ("Get Latest Profiles", lambda: test_get_latest_profiles(client))
-    ]
-    
-    # Run tests and collect results
-    results = []
-    for name, test_func in tests:
-        logger.info(f"Running test: {name}")
-        result = run_test(name, test_func)
-        results.append(result)
+    # The client's session is reused by every test and closed at the end
+    with DexscreenerClient() as client:
+        # Store test profile for reuse
+        test_profile = None
+        
+        # Define test cases
+        tests = [
+            ("Get Latest Profiles", lambda: test_get_latest_profiles(client))
+        ]
+        
+        # Run tests and collect results
+        results = []
+        for name, test_func in tests:
+            logger.info(f"Running test: {name}")
+            result = run_test(name, test_func)
+            results.append(result)
         
-        if result.passed:
-            logger.info(f"✅ {name}: PASSED")
-            if result.debug_info:
-                logger.info(f"Debug Info: {json.dumps(result.debug_info, indent=2)}")
-                
-                # Store first profile for pair tests
-                if name == "Get Latest Profiles" and result.debug_info.get("sample_profile"):
-                    test_profile = result.debug_info["sample_profile"]
-        else:
-            logger.error(f"❌ {name}: FAILED - {result.error}")
-    
-    # Add pair tests if we have a test profile
-    if test_profile:
-        pair_test = ("Get Token Pairs", lambda: test_get_token_pairs(client, test_profile))
-        result = run_test(*pair_test)
-        results.append(result)
+            if result.passed:
+                logger.info(f"✅ {name}: PASSED")
+                log_debug_info(result)
+                if result.debug_info:
+                    # Store first profile for pair tests
+                    if name == "Get Latest Profiles" and result.debug_info.get("sample_profile"):
+                        test_profile = result.debug_info["sample_profile"]
+            else:
+                logger.error(f"❌ {name}: FAILED - {result.error}")
         
-        if result.passed:
-            logger.info("✅ Get Token Pairs: PASSED")
-            if result.debug_info:
-                logger.info(f"Debug Info: {json.dumps(result.debug_info, indent=2)}")
-                
-                # Test pair data extraction if we have pairs
-                pairs = result.debug_info.get("raw_response", [])
-                if pairs:
-                    extraction_test = ("Parse Pair Data", lambda: test_pair_data_extraction(pairs[0]))
-                    result = run_test(*extraction_test)
-                    results.append(result)
-                    
-                    if result.passed:
-                        logger.info("✅ Parse Pair Data: PASSED")
-                        logger.info(f"Debug Info: {json.dumps(result.debug_info, indent=2)}")
+        # Add pair tests if we have a test profile
+        if test_profile:
+            pair_test = ("Get Token Pairs", lambda: test_get_token_pairs(client, test_profile))
+            result = run_test(*pair_test)
+            results.append(result)
+        
+            if result.passed:
+                logger.info("✅ Get Token Pairs: PASSED")
+                log_debug_info(result)
+                if result.debug_info:
+                    # Test pair data extraction on the first pair, if any
+                    sample_pair = result.debug_info.get("sample_pair")
+                    if sample_pair:
+                        extraction_test = ("Parse Pair Data", lambda: test_pair_data_extraction(sample_pair))
+                        result = run_test(*extraction_test)
+                        results.append(result)
+        
+                        if result.passed:
+                            logger.info("✅ Parse Pair Data: PASSED")
+                            log_debug_info(result)
+                        else:
+                            logger.error(f"❌ Parse Pair Data: FAILED - {result.error}")
                     else:
-                        logger.error(f"❌ Parse Pair Data: FAILED - {result.error}")
-                else:
-                    logger.warning("Skipping pair data extraction test - no pairs found")
-        else:
-            logger.error(f"❌ Get Token Pairs: FAILED - {result.error}")
-    
-    # Print summary
-    total = len(results)
-    passed = sum(1 for r in results if r.passed)
-    failed = total - passed
-    
-    logger.info("\nTest Summary:")
-    logger.info(f"Total Tests: {total}")
-    logger.info(f"Passed: {passed}")
-    logger.info(f"Failed: {failed}")
-    
-    # Print failed tests if any
-    if failed > 0:
-        logger.info("\nFailed Tests:")
-        for result in results:
-            if not result.passed:
-                logger.info(f"- {result.name}: {result.error}")
-        sys.exit(1)
-    
-    logger.info("\n✨ All tests passed successfully!")
+                        logger.warning("Skipping pair data extraction test - no pairs found")
+            else:
+                logger.error(f"❌ Get Token Pairs: FAILED - {result.error}")
+        
+    report_summary(logger, results)
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
@@ -2,19 +2,20 @@
 """
 Script to test RugCheck API functionality.
 Tests token risk assessment and validation.
+
+Run from the repository root with: python -m scripts.test_rugcheck
 """
 
 import sys
 import os
 import logging
 import json
-from typing import Optional, Dict, Any
-from dataclasses import dataclass
-
-# Add the app directory to the Python path
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from functools import partial
+from typing import Optional, Dict, Any, List
 
 from app.services.rugcheck_service import RugcheckService
+from scripts.harness import TestResult, report_summary, run_test, to_json
 
 # Configure logging
 logging.basicConfig(
@@ -23,22 +24,6 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-@dataclass
-class TestResult:
-    """Represents the result of a test case."""
-    name: str
-    passed: bool
-    error: Optional[str] = None
-    debug_info: Optional[Dict[str, Any]] = None
-
-def run_test(name: str, test_func) -> TestResult:
-    """Run a test and return its result."""
-    try:
-        debug_info = test_func()
-        return TestResult(name=name, passed=True, debug_info=debug_info)
-    except Exception as e:
-        return TestResult(name=name, passed=False, error=str(e))
-
 def test_rugcheck_assessment(rugcheck: RugcheckService, token_address: str) -> Dict[str, Any]:
     """Test token risk assessment for a specific token."""
     logger.info(f"\nTesting RugCheck assessment for token:")
@@ -84,49 +69,40 @@ def main():
     rugcheck_cfg = config.get("rugcheck", {})
     max_risk_score = rugcheck_cfg.get("max_risk_score", 1000)
     
-    rugcheck = RugcheckService(max_risk_score=max_risk_score)
-    logger.info(f"Initialized RugCheck service with max risk score: {max_risk_score}")
-    
-    # Test tokens
-    test_tokens = [
-        "2iU5qDuGoBzegJhHrkTL19t6RfR2pSWq3KEuxGKvpump",  # Known token from RugCheck
-        "3mn4TrUGUwxB4LPo8arBTx7sPMptBZ8n8Gdugu46us6c",  # Another token to test
-    ]
-    
-    # Run tests and collect results
-    results = []
-    for token_address in test_tokens:
-        test_name = f"RugCheck Assessment - {token_address}"
-        test_func = lambda: test_rugcheck_assessment(rugcheck, token_address)
-        result = run_test(test_name, test_func)
-        results.append(result)
+    # The service's session is reused by every assessment and closed at the end
+    with RugcheckService(max_risk_score=max_risk_score) as rugcheck:
+        logger.info(f"Initialized RugCheck service with max risk score: {max_risk_score}")
         
-        if result.passed:
-            logger.info(f"✅ {test_name}: PASSED")
-            if result.debug_info:
-                logger.info(f"Debug Info: {json.dumps(result.debug_info, indent=2)}")
-        else:
-            logger.error(f"❌ {test_name}: FAILED - {result.error}")
-    
-    # Print summary
-    total = len(results)
-    passed = sum(1 for r in results if r.passed)
-    failed = total - passed
-    
-    logger.info("\nTest Summary:")
-    logger.info(f"Total Tests: {total}")
-    logger.info(f"Passed: {passed}")
-    logger.info(f"Failed: {failed}")
-    
-    # Print failed tests if any
-    if failed > 0:
-        logger.info("\nFailed Tests:")
-        for result in results:
-            if not result.passed:
-                logger.info(f"- {result.name}: {result.error}")
-        sys.exit(1)
-    
-    logger.info("\n✨ All tests passed successfully!")
+        # Test tokens
+        test_tokens = [
+            "2iU5qDuGoBzegJhHrkTL19t6RfR2pSWq3KEuxGKvpump",  # Known token from RugCheck
+            "3mn4TrUGUwxB4LPo8arBTx7sPMptBZ8n8Gdugu46us6c",  # Another token to test
+        ]
+        
+        # Run the assessments concurrently; each one is a single HTTPS round trip.
+        # Results are reported as they complete but kept in token order
+        results: List[Optional[TestResult]] = [None] * len(test_tokens)
+        with ThreadPoolExecutor(max_workers=min(8, len(test_tokens))) as executor:
+            futures = {
+                executor.submit(
+                    run_test,
+                    f"RugCheck Assessment - {token_address}",
+                    partial(test_rugcheck_assessment, rugcheck, token_address)
+                ): idx
+                for idx, token_address in enumerate(test_tokens)
+            }
+            for future in as_completed(futures):
+                result = future.result()
+                results[futures[future]] = result
+        
+                if result.passed:
+                    logger.info(f"✅ {result.name}: PASSED")
+                    if result.debug_info:
+                        logger.info(f"Debug Info: {to_json(result.debug_info)}")
+                else:
+                    logger.error(f"❌ {result.name}: FAILED - {result.error}")
+        
+    report_summary(logger, results)
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
@@ -2,194 +2,261 @@
 """
 Script to test Telegram bot functionality.
 Tests connection, message sending, and error handling.
+
+Run from the repository root with: python -m scripts.test_telegram_bot
 """
 
-import sys
 import os
-import logging
+import re
+import sys
 import json
-from typing import Optional, Dict, Any
-from dataclasses import dataclass
-
-# Add the app directory to the Python path
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import queue
+import logging
+from logging.handlers import QueueHandler, QueueListener
+import orjson
+import requests
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Optional, Dict, Any, List, Tuple
+from functools import lru_cache
 
 from app.services.telegram_notifier import TelegramNotifier, NotifierConfig
+from scripts.harness import TestResult, report_summary, run_test, to_json
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+# Configure logging: records are queued by the logging thread and written to
+# stderr by a background listener, so tests never block on terminal writes
+_log_queue = queue.SimpleQueue()
+_stderr_handler = logging.StreamHandler(sys.stderr)
+_stderr_handler.setFormatter(
+    logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 )
+log_listener = QueueListener(_log_queue, _stderr_handler)
+# The queue handler only merges the message arguments; the listener's handler
+# applies the full format
+_queue_handler = QueueHandler(_log_queue)
+_queue_handler.setFormatter(logging.Formatter('%(message)s'))
+logging.basicConfig(level=logging.INFO, handlers=[_queue_handler])
 logger = logging.getLogger(__name__)
 
-@dataclass
-class TestResult:
-    """Represents the result of a test case."""
-    name: str
-    passed: bool
-    error: Optional[str] = None
-    debug_info: Optional[Dict[str, Any]] = None
+# Messages sent by the send tests
+PLAIN_MESSAGE = (
+    "🤖 Test Message: Hello from the Solana Coin Bot!\n"
+    "This is a test of the notification system."
+)
+
+HTML_MESSAGE = (
+    "<b>🚀 Token Alert Test</b>\n\n"
+    "<i>Testing HTML Formatting:</i>\n"
+    "• <b>Bold Text</b>\n"
+    "• <i>Italic Text</i>\n"
+    "• <code>Monospace Text</code>\n"
+    "• <a href='https://dexscreener.com'>Link Test</a>"
+)
+
+TOKEN_ALERT_MESSAGE = (
+    "<b>🔥 New Token Alert (TEST)</b>\n\n"
+    "<b>Token:</b> <code>TEST123...abc</code>\n"
+    "<b>Chain:</b> Solana\n"
+    "<b>Price:</b> $0.12345\n"
+    "<b>24h Change:</b> +15.67%\n"
+    "<b>Liquidity:</b> $100,000\n"
+    "<b>Volume:</b> $50,000\n\n"
+    "<b>Risk Score:</b> LOW (250)\n"
+    "<b>DexScreener:</b> <a href='https://dexscreener.com/test'>View Chart</a>"
+)
+
+# Message lengths reported in the send tests' debug info
+PLAIN_MESSAGE_LENGTH = len(PLAIN_MESSAGE)
+HTML_MESSAGE_LENGTH = len(HTML_MESSAGE)
+TOKEN_ALERT_MESSAGE_LENGTH = len(TOKEN_ALERT_MESSAGE)
+
+# Send tests: (test name, description, message, message length, parse mode)
+SEND_TESTS = (
+    ("Plain Message", "plain text message", PLAIN_MESSAGE, PLAIN_MESSAGE_LENGTH, None),
+    ("HTML Message", "HTML message", HTML_MESSAGE, HTML_MESSAGE_LENGTH, "HTML"),
+    ("Token Alert", "token alert message", TOKEN_ALERT_MESSAGE, TOKEN_ALERT_MESSAGE_LENGTH, "HTML")
+)
+
+# Bot tokens are "<numeric bot id>:<35 character secret>"
+BOT_TOKEN_RE = re.compile(r"^\d+:[A-Za-z0-9_-]{35}$")
+
+SEND_MESSAGE_URL = "https://api.telegram.org/bot{bot_token}/sendMessage"
+JSON_HEADERS = {"Content-Type": "application/json"}
+
+def load_credentials() -> Tuple[Optional[str], Optional[str]]:
+    """
+    Read the bot token and chat ID from the `telegram` section of
+    configs/config.json; the TELEGRAM_BOT_TOKEN and TELEGRAM_CHAT_ID
+    environment variables take precedence. Missing values are returned as
+    None and reported by the connection test.
+
+    :return: Bot token and chat ID
+    """
+    telegram_cfg: Dict[str, Any] = {}
+    config_path = os.path.join("configs", "config.json")
+    if os.path.exists(config_path):
+        try:
+            with open(config_path) as f:
+                telegram_cfg = json.load(f).get("telegram", {})
+        except Exception as e:
+            logger.error(f"Failed to load configuration: {e}")
+            sys.exit(1)
+    else:
+        logger.warning(f"{config_path} not found, using environment variables only")
+    
+    bot_token = os.getenv("TELEGRAM_BOT_TOKEN") or telegram_cfg.get("bot_token")
+    chat_id = os.getenv("TELEGRAM_CHAT_ID") or telegram_cfg.get("chat_id")
+    return bot_token, chat_id
+
+def build_send_body(chat_id: str, text: str, parse_mode: Optional[str] = None) -> bytes:
+    """Serialize a sendMessage payload once so each test posts ready-made bytes."""
+    payload = {"chat_id": chat_id, "text": text}
+    if parse_mode:
+        payload["parse_mode"] = parse_mode
+    return orjson.dumps(payload)
 
-def run_test(name: str, test_func) -> TestResult:
-    """Run a test and return its result."""
+def describe_api_error(response: requests.Response) -> str:
+    """Format an error reply from the Bot API; only decoded when a request fails."""
     try:
-        debug_info = test_func()
-        return TestResult(name=name, passed=True, debug_info=debug_info)
-    except Exception as e:
-        return TestResult(name=name, passed=False, error=str(e))
+        return to_json(orjson.loads(response.content))
+    except orjson.JSONDecodeError:
+        return response.text
+
+@lru_cache(maxsize=8)
+def build_notifier(bot_token: str, chat_id: str) -> TelegramNotifier:
+    """
+    Build a notifier for a bot token and chat ID pair. Construction validates
+    the credentials with a getMe call, so each pair is only checked once.
+
+    :raises ValueError: If the bot token is malformed; checked before any request
+    """
+    if not BOT_TOKEN_RE.match(bot_token or ""):
+        raise ValueError("Malformed bot token, expected '<bot id>:<35 character secret>'")
+    return TelegramNotifier(NotifierConfig(bot_token=bot_token, chat_id=chat_id))
 
-def test_bot_connection(notifier: TelegramNotifier) -> Dict[str, Any]:
-    """Test basic bot connection and credentials."""
-    notifier._validate_credentials()
+def test_bot_connection(bot_token: Optional[str], chat_id: Optional[str]) -> Dict[str, Any]:
+    """
+    Test basic bot connection and credentials by building the notifier and
+    its config, which checks the token format and then calls getMe.
+
+    :raises ValueError: If the bot token or chat ID is missing
+    """
+    if not bot_token or not chat_id:
+        raise ValueError(
+            "Missing telegram.bot_token or telegram.chat_id; set them in "
+            "configs/config.json or via TELEGRAM_BOT_TOKEN / TELEGRAM_CHAT_ID"
+        )
+    notifier = build_notifier(bot_token, str(chat_id))
     return {
         "bot_token": f"{notifier.config.bot_token[:6]}...{notifier.config.bot_token[-6:]}",
         "chat_id": notifier.config.chat_id
     }
 
-def test_send_plain_message(notifier: TelegramNotifier) -> Dict[str, Any]:
-    """Test sending a plain text message."""
-    message = (
-        "🤖 Test Message: Hello from the Solana Coin Bot!\n"
-        "This is a test of the notification system."
-    )
+def test_send_message(
+    notifier: TelegramNotifier,
+    url: str,
+    body: bytes,
+    description: str,
+    message_length: int
+) -> Dict[str, Any]:
+    """
+    Test sending one of the SEND_TESTS messages.
+
+    :param notifier: Notifier whose session and config are used
+    :param url: sendMessage endpoint for the bot
+    :param body: Pre-serialized sendMessage payload
+    :param description: What is being sent, used in error messages
+    :param message_length: Length of the message text, for the debug info
+    :return: Debug info for the test result
+    """
     try:
         response = notifier.session.post(
-            f"https://api.telegram.org/bot{notifier.config.bot_token}/sendMessage",
-            json={
-                "chat_id": notifier.config.chat_id,
-                "text": message
-            },
+            url,
+            data=body,
+            headers=JSON_HEADERS,
             timeout=notifier.config.timeout
         )
-        response_data = response.json()
-        
-        if not response.ok:
-            raise Exception(f"API Error: {json.dumps(response_data, indent=2)}")
+        response.raise_for_status()
             
         return {
-            "message_length": len(message),
-            "response": response_data
+            "message_length": message_length,
+            "response_status": response.status_code
         }
+    except requests.HTTPError as e:
+        raise Exception(f"Failed to send {description}: API Error: {describe_api_error(e.response)}")
     except Exception as e:
-        raise Exception(f"Failed to send plain text message: {str(e)}")
-
-def test_send_html_message(notifier: TelegramNotifier) -> Dict[str, Any]:
-    """Test sending a message with HTML formatting."""
-    message = (
-        "<b>🚀 Token Alert Test</b>\n\n"
-        "<i>Testing HTML Formatting:</i>\n"
-        "• <b>Bold Text</b>\n"
-        "• <i>Italic Text</i>\n"
-        "• <code>Monospace Text</code>\n"
-        "• <a href='https://dexscreener.com'>Link Test</a>"
-    )
-    try:
-        response = notifier.session.post(
-            f"https://api.telegram.org/bot{notifier.config.bot_token}/sendMessage",
-            json={
-                "chat_id": notifier.config.chat_id,
-                "text": message,
-                "parse_mode": "HTML"
-            },
-            timeout=notifier.config.timeout
+        raise Exception(f"Failed to send {description}: {str(e)}")
+
+def log_result(result: TestResult) -> None:
+    """Log whether a test passed, with its debug info."""
+    if result.passed:
+        logger.info(f"✅ {result.name}: PASSED")
+        # Only serialize the debug info when it will actually be logged
+        if result.debug_info and logger.isEnabledFor(logging.INFO):
+            logger.info("Debug Info: %s", to_json(result.debug_info))
+    else:
+        logger.error(f"❌ {result.name}: FAILED - {result.error}")
+
+def run_send_tests(notifier: TelegramNotifier) -> List[TestResult]:
+    """
+    Run the SEND_TESTS concurrently; each one is a single HTTPS round trip
+    over the notifier's pooled session. requests speaks HTTP/1.1, so every
+    in-flight request holds its own pooled connection; the pool is sized
+    well above the number of tests. Results are reported as they complete
+    but kept in test order.
+    """
+    # The notifier's session is a keep-alive connection pool, so the sends
+    # reuse its TLS connections instead of handshaking once per request
+    send_url = SEND_MESSAGE_URL.format(bot_token=notifier.config.bot_token)
+    chat_id = notifier.config.chat_id
+    
+    tests = tuple(
+        (
+            name,
+            test_send_message,
+            (notifier, send_url, build_send_body(chat_id, message, parse_mode), description, length)
         )
-        response_data = response.json()
-        
-        if not response.ok:
-            raise Exception(f"API Error: {json.dumps(response_data, indent=2)}")
-            
-        return {
-            "message_length": len(message),
-            "response": response_data
-        }
-    except Exception as e:
-        raise Exception(f"Failed to send HTML message: {str(e)}")
-
-def test_send_token_alert(notifier: TelegramNotifier) -> Dict[str, Any]:
-    """Test sending a formatted token alert message."""
-    message = (
-        "<b>🔥 New Token Alert (TEST)</b>\n\n"
-        "<b>Token:</b> <code>TEST123...abc</code>\n"
-        "<b>Chain:</b> Solana\n"
-        "<b>Price:</b> $0.12345\n"
-        "<b>24h Change:</b> +15.67%\n"
-        "<b>Liquidity:</b> $100,000\n"
-        "<b>Volume:</b> $50,000\n\n"
-        "<b>Risk Score:</b> LOW (250)\n"
-        "<b>DexScreener:</b> <a href='https://dexscreener.com/test'>View Chart</a>"
+        for name, description, message, length, parse_mode in SEND_TESTS
     )
-    try:
-        response = notifier.session.post(
-            f"https://api.telegram.org/bot{notifier.config.bot_token}/sendMessage",
-            json={
-                "chat_id": notifier.config.chat_id,
-                "text": message,
-                "parse_mode": "HTML"
-            },
-            timeout=notifier.config.timeout
-        )
-        response_data = response.json()
-        
-        if not response.ok:
-            raise Exception(f"API Error: {json.dumps(response_data, indent=2)}")
-            
-        return {
-            "message_length": len(message),
-            "response": response_data
-        }
-    except Exception as e:
-        raise Exception(f"Failed to send token alert message: {str(e)}")
+    
+    results: List[Optional[TestResult]] = [None] * len(tests)
+    with ThreadPoolExecutor(max_workers=len(tests)) as executor:
+        futures = {}
+        for idx, (name, test_func, args) in enumerate(tests):
+            logger.info(f"Running test: {name}")
+            futures[executor.submit(run_test, name, test_func, *args)] = idx
+        for future in as_completed(futures):
+            result = future.result()
+            results[futures[future]] = result
+            log_result(result)
+    return results
 
 def main():
     """Run all Telegram bot tests."""
     logger.info("Starting Telegram Bot Tests")
     
-    # Initialize notifier with test config
-    config = NotifierConfig()
-    notifier = TelegramNotifier(config)
-    
-    # Define test cases
-    tests = [
-        ("Bot Connection", lambda: test_bot_connection(notifier)),
-        ("Plain Message", lambda: test_send_plain_message(notifier)),
-        ("HTML Message", lambda: test_send_html_message(notifier)),
-        ("Token Alert", lambda: test_send_token_alert(notifier))
-    ]
+    bot_token, chat_id = load_credentials()
     
-    # Run tests and collect results
-    results = []
-    for name, test_func in tests:
-        logger.info(f"Running test: {name}")
-        result = run_test(name, test_func)
-        results.append(result)
-        
-        if result.passed:
-            logger.info(f"✅ {name}: PASSED")
-            if result.debug_info:
-                logger.info(f"Debug Info: {json.dumps(result.debug_info, indent=2)}")
-        else:
-            logger.error(f"❌ {name}: FAILED - {result.error}")
+    # The connection test builds the notifier, validating the credentials with
+    # getMe; that also opens the first TLS connection to api.telegram.org.
+    # It runs first so bad credentials are reported as a failed test
+    logger.info("Running test: Bot Connection")
+    connection_result = run_test("Bot Connection", test_bot_connection, bot_token, chat_id)
+    log_result(connection_result)
+    results = [connection_result]
     
-    # Print summary
-    total = len(results)
-    passed = sum(1 for r in results if r.passed)
-    failed = total - passed
+    if connection_result.passed:
+        # Served from the cache: the notifier built by the connection test
+        notifier = build_notifier(bot_token, str(chat_id))
+        results.extend(run_send_tests(notifier))
+    else:
+        logger.warning("Skipping send tests - no working notifier")
     
-    logger.info("\nTest Summary:")
-    logger.info(f"Total Tests: {total}")
-    logger.info(f"Passed: {passed}")
-    logger.info(f"Failed: {failed}")
-    
-    # Print failed tests if any
-    if failed > 0:
-        logger.info("\nFailed Tests:")
-        for result in results:
-            if not result.passed:
-                logger.info(f"- {result.name}: {result.error}")
-        sys.exit(1)
-    
-    logger.info("\n✨ All tests passed successfully!")
+    report_summary(logger, results)
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    log_listener.start()
+    try:
+        main()
+    finally:
+        # Flush queued records, including on sys.exit()
+        log_listener.stop() 
\ No newline at end of file
@@ -0,0 +1,23 @@
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.database.base import Base
+# Register the models on Base.metadata
+import app.database.models  # noqa: F401
+
+
+@pytest.fixture
+def db_engine(tmp_path):
+    """Engine on a fresh SQLite file database with all tables created."""
+    # A file database, since in-memory SQLite is private to each thread
+    engine = create_engine(f"sqlite:///{tmp_path / 'test.db'}")
+    Base.metadata.create_all(engine)
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def session_factory(db_engine):
+    """Session factory bound to the test database."""
+    return sessionmaker(bind=db_engine, expire_on_commit=False)
@@ -1 +1,75 @@
- 
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import update
+
+from app.database.models import TokenPriceHistory
+from app.database.writer import SnapshotWrite, SnapshotWriter
+from app.services.analysis import analyze_pumped_tokens
+
+
+def snapshot_values(token_address, price_usd, volume_usd=5000.0):
+    return {
+        'chain_id': 'solana',
+        'token_address': token_address,
+        'token_symbol': token_address.upper(),
+        'price_usd': price_usd,
+        'liquidity_usd': 10000.0,
+        'volume_usd': volume_usd,
+    }
+
+
+def write_snapshots(session_factory, *values):
+    with SnapshotWriter(session_factory=session_factory, flush_interval_sec=0.01) as writer:
+        for row in values:
+            writer.put(SnapshotWrite(values=row))
+
+
+def backdate_history(session_factory, minutes):
+    """Move every stored price point `minutes` into the past."""
+    with session_factory() as session:
+        session.execute(
+            update(TokenPriceHistory).values(
+                timestamp=datetime.utcnow() - timedelta(minutes=minutes)
+            )
+        )
+        session.commit()
+
+
+def test_pumped_token_reported_with_first_and_last_price(session_factory):
+    write_snapshots(session_factory, snapshot_values('pump', 1.0), snapshot_values('flat', 2.0))
+    backdate_history(session_factory, 10)
+    write_snapshots(session_factory, snapshot_values('pump', 1.5), snapshot_values('flat', 2.1))
+
+    with session_factory() as session:
+        pumped = analyze_pumped_tokens(session, lookback_minutes=60, min_price_increase_percent=20.0)
+
+    assert [token['token_address'] for token in pumped] == ['pump']
+    assert pumped[0]['initial_price'] == pytest.approx(1.0)
+    assert pumped[0]['current_price'] == pytest.approx(1.5)
+    assert pumped[0]['price_change_percent'] == pytest.approx(50.0)
+
+
+def test_single_price_point_is_not_a_pump(session_factory):
+    write_snapshots(session_factory, snapshot_values('new', 1.0))
+
+    with session_factory() as session:
+        assert analyze_pumped_tokens(session, min_price_increase_percent=0.0) == []
+
+
+def test_points_outside_lookback_are_ignored(session_factory):
+    write_snapshots(session_factory, snapshot_values('old', 1.0))
+    backdate_history(session_factory, 120)
+    write_snapshots(session_factory, snapshot_values('old', 3.0))
+
+    with session_factory() as session:
+        assert analyze_pumped_tokens(session, lookback_minutes=60) == []
+
+
+def test_low_volume_pump_is_filtered(session_factory):
+    write_snapshots(session_factory, snapshot_values('thin', 1.0, volume_usd=10.0))
+    backdate_history(session_factory, 10)
+    write_snapshots(session_factory, snapshot_values('thin', 2.0, volume_usd=10.0))
+
+    with session_factory() as session:
+        assert analyze_pumped_tokens(session, min_volume_usd=1000.0) == []
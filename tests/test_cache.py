@@ -0,0 +1,65 @@
+import pytest
+
+from app.core import cache as cache_module
+from app.core.cache import TTLCache
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Controllable replacement for time.monotonic in the cache module."""
+    now = [1000.0]
+    monkeypatch.setattr(cache_module.time, 'monotonic', lambda: now[0])
+    return now
+
+
+def test_get_returns_default_on_miss():
+    cache = TTLCache()
+
+    assert cache.get('missing') is None
+    assert cache.get('missing', default='x') == 'x'
+
+
+def test_entries_expire_after_ttl(clock):
+    cache = TTLCache(ttl=60)
+    cache.set('token', {'score': 1})
+
+    clock[0] += 59
+    assert cache.get('token') == {'score': 1}
+
+    clock[0] += 1
+    assert cache.get('token') is None
+    assert len(cache) == 0
+
+
+def test_set_refreshes_ttl(clock):
+    cache = TTLCache(ttl=60)
+    cache.set('token', 1)
+    clock[0] += 50
+    cache.set('token', 2)
+    clock[0] += 50
+
+    assert cache.get('token') == 2
+
+
+def test_evicts_least_recently_used():
+    cache = TTLCache(maxsize=2)
+    cache.set('a', 1)
+    cache.set('b', 2)
+    # Reading 'a' makes 'b' the least recently used entry
+    cache.get('a')
+    cache.set('c', 3)
+
+    assert len(cache) == 2
+    assert cache.get('b') is None
+    assert (cache.get('a'), cache.get('c')) == (1, 3)
+
+
+def test_clear_removes_all_entries():
+    cache = TTLCache()
+    cache.set('a', 1)
+    cache.set('b', 2)
+
+    cache.clear()
+
+    assert len(cache) == 0
+    assert cache.get('a') is None
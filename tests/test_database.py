@@ -0,0 +1,69 @@
+import json
+
+import pytest
+from sqlalchemy import create_engine, inspect, text
+
+from app.core.risk import classify_risk
+from app.database import base
+
+
+@pytest.fixture
+def legacy_engine(tmp_path, monkeypatch):
+    """Engine on a database created before token_snapshots had risk_level."""
+    engine = create_engine(f"sqlite:///{tmp_path / 'legacy.db'}")
+    with engine.begin() as conn:
+        conn.execute(text(
+            "CREATE TABLE token_snapshots ("
+            "id INTEGER PRIMARY KEY, "
+            "timestamp DATETIME DEFAULT CURRENT_TIMESTAMP NOT NULL, "
+            "token_address VARCHAR(255) NOT NULL, "
+            "chain_id VARCHAR(50) NOT NULL, "
+            "risk_data JSON)"
+        ))
+    monkeypatch.setattr(base, 'engine', engine)
+    yield engine
+    engine.dispose()
+
+
+def insert_snapshot(engine, token_address, risk_data):
+    with engine.begin() as conn:
+        conn.execute(
+            text(
+                "INSERT INTO token_snapshots (token_address, chain_id, risk_data) "
+                "VALUES (:token_address, 'solana', :risk_data)"
+            ),
+            {'token_address': token_address, 'risk_data': json.dumps(risk_data)},
+        )
+
+
+def risk_levels(engine):
+    with engine.connect() as conn:
+        return dict(conn.execute(text("SELECT token_address, risk_level FROM token_snapshots")).all())
+
+
+def test_risk_level_backfilled_like_classify_risk(legacy_engine):
+    scores = {'low': 100, 'edge': 500, 'medium': 600.5, 'high': 999, 'critical': 5000}
+    for token_address, score in scores.items():
+        insert_snapshot(legacy_engine, token_address, {'score': score, 'risks': []})
+    insert_snapshot(legacy_engine, 'unscored', {'risks': []})
+    insert_snapshot(legacy_engine, 'unchecked', None)
+
+    base.ensure_risk_level_column()
+
+    expected = {token_address: classify_risk(score) for token_address, score in scores.items()}
+    expected.update(unscored=None, unchecked=None)
+    assert risk_levels(legacy_engine) == expected
+    assert expected['edge'] == 'MEDIUM'
+
+
+def test_existing_risk_level_column_is_left_alone(legacy_engine):
+    insert_snapshot(legacy_engine, 'a', {'score': 100})
+    base.ensure_risk_level_column()
+    with legacy_engine.begin() as conn:
+        conn.execute(text("UPDATE token_snapshots SET risk_level = 'HIGH'"))
+
+    base.ensure_risk_level_column()
+
+    columns = [col['name'] for col in inspect(legacy_engine).get_columns('token_snapshots')]
+    assert columns.count('risk_level') == 1
+    assert risk_levels(legacy_engine) == {'a': 'HIGH'}
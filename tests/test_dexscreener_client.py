@@ -1 +1,45 @@
- 
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import Mock
+
+import pytest
+import requests
+
+from app.services.dexscreener_client import DexscreenerClient, DexscreenerError, RateLimit
+
+
+@pytest.fixture
+def client(monkeypatch):
+    """Client with a mocked session and rate limiting effectively disabled."""
+    monkeypatch.setattr(
+        DexscreenerClient, 'RATE_LIMITS', {"pairs": RateLimit(10**9, "pair data")}
+    )
+    return DexscreenerClient(session=Mock(spec=requests.Session))
+
+
+def test_concurrent_failures_are_all_counted(client):
+    client.session.get.side_effect = requests.exceptions.ConnectionError("down")
+
+    def request(_):
+        with pytest.raises(DexscreenerError):
+            client._make_request("/latest/dex/pairs", "pairs")
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        list(executor.map(request, range(400)))
+
+    stats = client.get_stats()
+    assert stats["total_requests"] == 400
+    assert stats["failed_requests"] == 400
+    assert stats["consecutive_failures"] == 400
+    assert stats["is_healthy"] is False
+
+
+def test_success_resets_consecutive_failures(client):
+    ok = Mock(status_code=200, content=b'{"pairs": []}')
+    client.session.get.side_effect = [requests.exceptions.ConnectionError("down"), ok]
+
+    with pytest.raises(DexscreenerError):
+        client._make_request("/latest/dex/pairs", "pairs")
+    assert client._make_request("/latest/dex/pairs", "pairs") == {"pairs": []}
+
+    stats = client.get_stats()
+    assert (stats["total_requests"], stats["failed_requests"], stats["consecutive_failures"]) == (2, 1, 0)
@@ -0,0 +1,28 @@
+from decimal import Decimal
+
+import pytest
+
+from app.tasks.fetch_and_store import safe_float
+
+
+@pytest.mark.parametrize("value, expected", [
+    (5, 5.0),
+    (2.5, 2.5),
+    ("1.25", 1.25),
+    ("  42 ", 42.0),
+    ("-3", -3.0),
+    (".5", 0.5),
+    ("1e3", 1000.0),
+    ("1.5k", 1_500.0),
+    ("2M", 2_000_000.0),
+    ("0.5b", 500_000_000.0),
+    (Decimal("0.25"), 0.25),
+])
+def test_safe_float_converts_numbers(value, expected):
+    assert safe_float(value) == pytest.approx(expected)
+
+
+@pytest.mark.parametrize("value", [None, True, False, "", "abc", "1.2.3", "k", "10x", "1,000", [], {}])
+def test_safe_float_returns_default_for_invalid_values(value):
+    assert safe_float(value) is None
+    assert safe_float(value, default=0.0) == 0.0
@@ -0,0 +1,60 @@
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import requests
+
+from app.core.http import create_http_session
+
+
+@pytest.fixture
+def server():
+    """Local HTTP server answering GET /slow slowly and GET /unavailable with 503."""
+    hits = []
+    release = threading.Event()
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            hits.append(self.path)
+            if self.path == '/slow':
+                release.wait(2)
+                status = 200
+            else:
+                status = 503
+            self.send_response(status)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+
+        def log_message(self, *args):
+            pass
+
+    httpd = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{httpd.server_port}", hits
+    release.set()
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def test_read_timeout_is_not_retried(server):
+    base_url, hits = server
+    session = create_http_session(max_retries=3, backoff_factor=0)
+
+    started = time.monotonic()
+    with pytest.raises(requests.exceptions.ReadTimeout):
+        session.get(f"{base_url}/slow", timeout=0.2)
+
+    assert hits == ['/slow']
+    assert time.monotonic() - started < 1
+
+
+def test_gateway_errors_are_retried(server):
+    base_url, hits = server
+    session = create_http_session(max_retries=3, backoff_factor=0)
+
+    response = session.get(f"{base_url}/unavailable", timeout=2)
+
+    assert response.status_code == 503
+    assert len(hits) == 4
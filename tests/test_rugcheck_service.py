@@ -0,0 +1,45 @@
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import Mock
+
+import pytest
+import requests
+
+from app.services.rugcheck_service import RugcheckError, RugcheckService
+
+
+def test_concurrent_assessment_failures_are_all_counted():
+    session = Mock(spec=requests.Session)
+    session.get.side_effect = requests.exceptions.ConnectionError("down")
+    service = RugcheckService(session=session)
+
+    def assess(i):
+        with pytest.raises(RugcheckError):
+            service.assess_token_risk(f"token{i}")
+
+    # Same worker count as the fetch_and_store rug checks
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        list(executor.map(assess, range(400)))
+
+    stats = service.get_stats()
+    assert stats["total_requests"] == 400
+    assert stats["failed_requests"] == 400
+    assert stats["consecutive_failures"] == 400
+    assert stats["is_healthy"] is False
+
+
+def test_assessments_are_cached_and_failures_are_not():
+    ok = Mock()
+    ok.json.return_value = {"score": 100, "risks": []}
+    session = Mock(spec=requests.Session)
+    session.get.side_effect = [requests.exceptions.ConnectionError("down"), ok]
+    service = RugcheckService(session=session)
+
+    with pytest.raises(RugcheckError):
+        service.assess_token_risk("token")
+    first = service.assess_token_risk("token")
+    second = service.assess_token_risk("token")
+
+    assert first is second
+    assert first.is_safe
+    assert session.get.call_count == 2
+    assert service.get_stats()["consecutive_failures"] == 0
@@ -0,0 +1,105 @@
+import signal
+import threading
+from unittest.mock import Mock
+
+from app.tasks.scheduler import (
+    DIGEST_SEPARATOR,
+    Scheduler,
+    SchedulerError,
+    SchedulerHealth,
+    build_digests,
+)
+
+
+def test_build_digests_empty():
+    assert build_digests([]) == []
+
+
+def test_build_digests_joins_up_to_batch_size():
+    messages = [f"alert {i}" for i in range(5)]
+
+    digests = build_digests(messages, batch_size=2)
+
+    assert digests == [
+        DIGEST_SEPARATOR.join(messages[0:2]),
+        DIGEST_SEPARATOR.join(messages[2:4]),
+        messages[4],
+    ]
+
+
+def test_build_digests_respects_max_chars():
+    messages = ["a" * 10, "b" * 10, "c" * 10]
+    # Two messages plus one separator fit, a third does not
+    max_chars = 20 + len(DIGEST_SEPARATOR)
+
+    digests = build_digests(messages, batch_size=10, max_chars=max_chars)
+
+    assert digests == [DIGEST_SEPARATOR.join(messages[:2]), messages[2]]
+    assert all(len(digest) <= max_chars for digest in digests)
+
+
+def test_build_digests_sends_oversized_message_alone():
+    messages = ["short", "x" * 50, "tail"]
+
+    digests = build_digests(messages, batch_size=10, max_chars=20)
+
+    assert digests == messages
+
+
+def test_build_digests_keeps_order():
+    messages = [str(i) for i in range(25)]
+
+    digests = build_digests(messages, batch_size=10)
+
+    assert len(digests) == 3
+    assert DIGEST_SEPARATOR.join(digests).split(DIGEST_SEPARATOR) == messages
+
+
+def bare_scheduler(max_consecutive_failures=3):
+    """Scheduler with mocked collaborators and no signal handlers installed."""
+    scheduler = Scheduler.__new__(Scheduler)
+    scheduler.interval_sec = 0
+    scheduler.max_consecutive_failures = max_consecutive_failures
+    scheduler.error_cooldown_sec = 0
+    scheduler.health = SchedulerHealth(is_running=True)
+    scheduler._stop = threading.Event()
+    scheduler.task_runner = Mock()
+    scheduler.http_session = Mock()
+    return scheduler
+
+
+def test_shutdown_signal_only_stops_the_loop():
+    scheduler = bare_scheduler()
+
+    scheduler._handle_shutdown(signal.SIGTERM, None)
+
+    assert scheduler.health.is_running is False
+    assert scheduler._stop.is_set()
+    # Notifications and cache cleanup are left to run()
+    assert scheduler.task_runner.mock_calls == []
+
+
+def test_critical_failure_reports_last_success():
+    scheduler = bare_scheduler(max_consecutive_failures=2)
+    runner = scheduler.task_runner
+    runner.run_fetch_and_store.side_effect = [1, SchedulerError("a"), SchedulerError("b")]
+    # Stop after the critical alert
+    runner.notify_error.side_effect = lambda message: scheduler._stop.set()
+
+    scheduler.run()
+
+    (message,), _ = runner.notify_error.call_args
+    assert message.startswith("⛔ Critical: 2 consecutive failures. Last success: 0:00:00 ago.")
+    assert message.endswith("Last error: b")
+
+
+def test_critical_failure_without_any_success():
+    scheduler = bare_scheduler(max_consecutive_failures=1)
+    runner = scheduler.task_runner
+    runner.run_fetch_and_store.side_effect = SchedulerError("down")
+    runner.notify_error.side_effect = lambda message: scheduler._stop.set()
+
+    scheduler.run()
+
+    (message,), _ = runner.notify_error.call_args
+    assert "Last success: never." in message
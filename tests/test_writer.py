@@ -0,0 +1,119 @@
+import pytest
+from sqlalchemy import func, select
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.database import writer as writer_module
+from app.database.models import TokenPriceHistory, TokenSnapshot
+from app.database.writer import SnapshotWrite, SnapshotWriter
+
+
+def snapshot_values(token_address, price_usd=1.0):
+    return {
+        'chain_id': 'solana',
+        'token_address': token_address,
+        'token_symbol': token_address.upper(),
+        'price_usd': price_usd,
+        'liquidity_usd': 10000.0,
+        'volume_usd': 5000.0,
+        'risk_data': {'score': 100},
+        'risk_level': 'LOW',
+    }
+
+
+def count_rows(session_factory, model):
+    with session_factory() as session:
+        return session.scalar(select(func.count()).select_from(model))
+
+
+class FailingCommitSession(Session):
+    def commit(self):
+        raise OperationalError("COMMIT", {}, Exception("database is locked"))
+
+
+@pytest.mark.parametrize("upsert_dialects", [writer_module.UPSERT_DIALECTS, ()])
+def test_insert_then_upsert_keeps_one_row_per_token(session_factory, monkeypatch, upsert_dialects):
+    # An empty dialect list forces the update-by-id fallback
+    monkeypatch.setattr(writer_module, 'UPSERT_DIALECTS', upsert_dialects)
+
+    with SnapshotWriter(session_factory=session_factory) as writer:
+        writer.put(SnapshotWrite(values=snapshot_values('a', 1.0)))
+    assert writer.written == 1
+
+    values = snapshot_values('a', 2.0)
+    values['risk_level'] = 'HIGH'
+    with SnapshotWriter(session_factory=session_factory) as writer:
+        writer.put(SnapshotWrite(values=values))
+        writer.put(SnapshotWrite(values=snapshot_values('b', 3.0)))
+    assert (writer.written, writer.failed) == (2, 0)
+
+    with session_factory() as session:
+        snapshots = {s.token_address: s for s in session.scalars(select(TokenSnapshot))}
+        history = session.scalars(
+            select(TokenPriceHistory.price_usd).order_by(TokenPriceHistory.id)
+        ).all()
+    assert set(snapshots) == {'a', 'b'}
+    assert snapshots['a'].price_usd == 2.0
+    assert snapshots['a'].risk_level == 'HIGH'
+    assert history == [1.0, 2.0, 3.0]
+
+
+def test_on_commit_runs_after_commit(session_factory):
+    seen = []
+
+    def on_commit():
+        # A separate session only sees the row once it is committed
+        seen.append(count_rows(session_factory, TokenSnapshot))
+
+    with SnapshotWriter(session_factory=session_factory) as writer:
+        writer.put(SnapshotWrite(values=snapshot_values('a'), on_commit=on_commit))
+        writer.put(SnapshotWrite(values=snapshot_values('b'), on_commit=on_commit))
+
+    assert seen == [2, 2]
+
+
+def test_on_commit_skipped_when_commit_fails(db_engine):
+    session_factory = sessionmaker(bind=db_engine, class_=FailingCommitSession)
+    called = []
+
+    with SnapshotWriter(session_factory=session_factory) as writer:
+        writer.put(SnapshotWrite(values=snapshot_values('a'), on_commit=lambda: called.append('a')))
+
+    assert called == []
+    assert (writer.written, writer.failed) == (0, 1)
+    assert count_rows(sessionmaker(bind=db_engine), TokenSnapshot) == 0
+
+
+def test_failing_page_counts_every_write_as_failed(session_factory):
+    called = []
+    bad = snapshot_values('bad')
+    bad['token_address'] = None  # violates NOT NULL
+
+    # One write per page: the first is pending when the second page fails,
+    # and the third arrives after the transaction is lost
+    with SnapshotWriter(session_factory=session_factory, batch_size=1) as writer:
+        writer.put(SnapshotWrite(values=snapshot_values('a'), on_commit=lambda: called.append('a')))
+        writer.put(SnapshotWrite(values=bad))
+        writer.put(SnapshotWrite(values=snapshot_values('c'), on_commit=lambda: called.append('c')))
+
+    assert (writer.written, writer.failed) == (0, 3)
+    assert called == []
+    assert count_rows(session_factory, TokenSnapshot) == 0
+    assert count_rows(session_factory, TokenPriceHistory) == 0
+
+
+def test_close_reraises_unexpected_errors(session_factory, monkeypatch):
+    def broken_batch(self, session, upsert, batch):
+        raise RuntimeError("boom")
+
+    monkeypatch.setattr(SnapshotWriter, '_execute_batch', broken_batch)
+
+    writer = SnapshotWriter(session_factory=session_factory, batch_size=1)
+    writer.start()
+    writer.put(SnapshotWrite(values=snapshot_values('a')))
+    writer.put(SnapshotWrite(values=snapshot_values('b')))
+    with pytest.raises(RuntimeError, match="boom"):
+        writer.close()
+
+    assert (writer.written, writer.failed) == (0, 2)
+    assert count_rows(session_factory, TokenSnapshot) == 0